@@ -0,0 +1,62 @@
+"""
+Conditional GET helpers (ETag / Cache-Control) for slow-changing endpoints.
+"""
+from typing import Any, NamedTuple
+import orjson
+import xxhash
+from fastapi import Request, Response
+
+
+class Encoded(NamedTuple):
+    """A serialized JSON body and its weak ETag."""
+    body: bytes
+    etag: str
+
+
+def encode(payload: Any) -> Encoded:
+    """Serialize `payload` once so constant bodies can be reused per request."""
+    body = orjson.dumps(payload)
+    return Encoded(body, f'W/"{xxhash.xxh3_64_hexdigest(body)}"')
+
+
+def etag_response(
+    request: Request,
+    payload: Any,
+    max_age: int = 5,
+    stale_while_revalidate: int = 0,
+    etag_source: Any = None
+) -> Response:
+    """
+    Serialize `payload` and answer with a weak ETag.
+    
+    Returns an empty 304 when the client's If-None-Match already matches.
+    
+    Args:
+        request: Incoming request
+        payload: JSON-serializable body, or an `Encoded` one
+        max_age: Cache-Control max-age in seconds
+        stale_while_revalidate: Seconds a stale copy may be served while
+            revalidating (omitted when 0)
+        etag_source: Data the ETag is computed from instead of the body,
+            for bodies carrying volatile fields such as a timestamp
+    
+    Returns:
+        200 JSON response or 304 Not Modified
+    """
+    if etag_source is not None:
+        body, etag = orjson.dumps(payload), encode(etag_source).etag
+    else:
+        body, etag = payload if isinstance(payload, Encoded) else encode(payload)
+    cache_control = f"max-age={max_age}"
+    if stale_while_revalidate:
+        cache_control += f", stale-while-revalidate={stale_while_revalidate}"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(body, media_type="application/json", headers=headers)
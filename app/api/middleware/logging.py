@@ -1,80 +1,149 @@
-from fastapi import Request
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from datetime import datetime
-import uuid
+import logging
 import time
+from typing import Optional
+import orjson
+from app.utils.clock import utc_now_iso
+from app.utils.ids import new_id
 from app.utils.logger import get_logger
 
 
 logger = get_logger("middleware")
 
+_perf_ns = time.perf_counter_ns
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
+# Pre-encoded response header names
+_H_RID = b"x-request-id"
+_H_PT = b"x-process-time"
+
+# Liveness/monitoring polls that bypass request logging entirely
+_SKIP_PATHS = frozenset({"/health", "/monitoring/health", "/monitoring/cache-stats"})
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    """Return a raw header value from the ASGI scope (names are lowercase)."""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+class ErrorHandlingMiddleware:
     """Middleware for centralized error handling."""
-    
-    async def dispatch(self, request: Request, call_next):
-        # Add request ID if not exists
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
-        
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
+            # Add request ID if not exists
+            request_id_b = _header(scope, _H_RID)
+            request_id = request_id_b.decode("latin-1") if request_id_b else new_id()
+
             logger.error(
                 "Unhandled error in middleware",
                 extra={"extra_data": {
                     "request_id": request_id,
-                    "path": request.url.path,
-                    "method": request.method,
+                    "path": scope["path"],
+                    "method": scope["method"],
                     "error": str(exc)
                 }}
             )
-            
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "detail": "Internal server error",
+
+            # Headers already sent, nothing left to answer with
+            if response_started:
+                raise
+
+            body = orjson.dumps({
+                "detail": "Internal server error",
+                "request_id": request_id,
+                "timestamp": utc_now_iso()
+            })
+
+            await send({
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+
+
+class LoggingMiddleware:
+    """Middleware for logging requests and responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        log_enabled = logger.isEnabledFor(logging.INFO)
+        request_id_b = _header(scope, _H_RID)
+        if request_id_b is None and log_enabled:
+            request_id_b = new_id().encode("latin-1")
+        request_id = request_id_b.decode("latin-1") if log_enabled else None
+        method = scope["method"]
+        start_ns = _perf_ns()
+
+        if log_enabled:
+            client = scope.get("client")
+            logger.info(
+                "Request received",
+                extra={"extra_data": {
                     "request_id": request_id,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
+                    "method": method,
+                    "path": path,
+                    "client": client[0] if client else None
+                }}
             )
 
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                process_time_ns = _perf_ns() - start_ns
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging requests and responses."""
-    
-    async def dispatch(self, request: Request, call_next):
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
-        start_time = time.time()
-        
-        logger.info(
-            "Request received",
-            extra={"extra_data": {
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "client": request.client.host if request.client else None
-            }}
-        )
-        
-        response = await call_next(request)
-        
-        process_time = time.time() - start_time
-        
-        logger.info(
-            "Request processed",
-            extra={"extra_data": {
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "process_time_ms": int(process_time * 1000)
-            }}
-        )
-        
-        # Add custom headers
-        response.headers["X-Request-ID"] = request_id
-        response.headers["X-Process-Time"] = str(process_time)
-        
-        return response
\ No newline at end of file
+                if log_enabled:
+                    logger.info(
+                        "Request processed",
+                        extra={"extra_data": {
+                            "request_id": request_id,
+                            "method": method,
+                            "path": path,
+                            "status_code": message["status"],
+                            "process_time_ms": process_time_ns // 1_000_000
+                        }}
+                    )
+
+                # Add custom headers
+                headers = message.get("headers")
+                if not isinstance(headers, list):
+                    headers = message["headers"] = list(headers or ())
+                if request_id_b:
+                    headers.append((_H_RID, request_id_b))
+                headers.append((_H_PT, f"{process_time_ns / 1e9:.6f}".encode("latin-1")))
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
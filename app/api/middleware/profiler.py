@@ -0,0 +1,53 @@
+from pyinstrument import Profiler
+from app.utils.logger import get_logger
+
+
+logger = get_logger("profiler")
+
+_PROFILE_FLAG = b"profile=1"
+
+
+class ProfilerMiddleware:
+    """
+    Middleware that profiles a request with pyinstrument.
+    
+    Active only for requests carrying `?profile=1`; the endpoint response
+    is discarded and replaced by the HTML call-stack report.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _PROFILE_FLAG not in scope["query_string"].split(b"&"):
+            await self.app(scope, receive, send)
+            return
+
+        async def discard_send(message):
+            pass
+
+        profiler = Profiler(interval=0.001, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard_send)
+        finally:
+            profiler.stop()
+
+        logger.info(
+            "Request profiled",
+            extra={"extra_data": {
+                "path": scope["path"],
+                "duration_s": profiler.last_session.duration if profiler.last_session else None
+            }}
+        )
+
+        body = profiler.output_html().encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/html; charset=utf-8"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
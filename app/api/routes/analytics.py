@@ -1,20 +1,26 @@
-from fastapi import APIRouter, Query
+import heapq
+from operator import itemgetter
+from fastapi import APIRouter, Depends, Query, Request
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
+from app.api.etag import etag_response
 from app.schemas.responses import AnalyticsSchema
-from app.repositories.process_repository import get_repository
+from app.repositories.process_repository import ProcessoRepository, get_repository
 from app.domain.policies import get_policy_by_id
+from app.utils.clock import utc_now_iso
 from app.utils.logger import get_logger
 
 
 logger = get_logger("analytics_route")
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
-repository = get_repository()
 
 
 @router.get("/summary", response_model=Dict)
-async def get_analytics_summary():
+async def get_analytics_summary(
+    request: Request,
+    repository: ProcessoRepository = Depends(get_repository)
+):
     """
     Return analytical summary of verifications performed.
     
@@ -28,7 +34,7 @@ async def get_analytics_summary():
     policy_usage = repository.get_policy_usage()
     
     politicas_citadas = []
-    for policy_id, count in list(policy_usage.items())[:5]:
+    for policy_id, count in heapq.nlargest(5, policy_usage.items(), key=itemgetter(1)):
         try:
             policy = get_policy_by_id(policy_id)
             politicas_citadas.append({
@@ -47,7 +53,7 @@ async def get_analytics_summary():
         }}
     )
     
-    return {
+    resumo = {
         "total_verificacoes": stats["total"],
         "aprovados": stats["approved"],
         "rejeitados": stats["rejected"],
@@ -55,13 +61,22 @@ async def get_analytics_summary():
         "taxa_aprovacao_percentual": round(stats["taxa_aprovacao"], 2),
         "taxa_rejeicao_percentual": round(100 - stats["taxa_aprovacao"] - (stats["incomplete"] / stats["total"] * 100 if stats["total"] > 0 else 0), 2),
         "tempo_medio_processamento_ms": round(stats["tempo_medio_ms"], 2),
-        "politicas_mais_citadas": politicas_citadas,
-        "timestamp": datetime.utcnow().isoformat()
+        "politicas_mais_citadas": politicas_citadas
     }
+    
+    # The timestamp changes every second, keep it out of the ETag
+    return etag_response(
+        request,
+        {**resumo, "timestamp": utc_now_iso()},
+        etag_source=resumo
+    )
 
 
 @router.get("/policies-usage", response_model=Dict[str, int])
-async def get_policies_usage():
+async def get_policies_usage(
+    request: Request,
+    repository: ProcessoRepository = Depends(get_repository)
+):
     """
     Return usage count of each policy.
     
@@ -75,11 +90,13 @@ async def get_policies_usage():
         extra={"extra_data": {"total_policies": len(usage)}}
     )
     
-    return usage
+    return etag_response(request, usage)
 
 
 @router.get("/decision-distribution", response_model=Dict[str, int])
-async def get_decision_distribution():
+async def get_decision_distribution(
+    repository: ProcessoRepository = Depends(get_repository)
+):
     """
     Return decision distribution in the period.
     
@@ -97,34 +114,29 @@ async def get_decision_distribution():
 
 
 @router.get("/processing-time", response_model=Dict)
-async def get_processing_time_stats():
+async def get_processing_time_stats(
+    repository: ProcessoRepository = Depends(get_repository)
+):
     """
     Return processing time statistics.
     
     Includes average, minimum and maximum observed time.
     """
-    verificacoes = repository.get_all()
-    
-    if not verificacoes:
-        return {
-            "media_ms": 0,
-            "minimo_ms": 0,
-            "maximo_ms": 0,
-            "total_processamentos": 0
-        }
-    
-    tempos = [v.tempo_processamento_ms for v in verificacoes if v.tempo_processamento_ms]
+    stats = repository.get_processing_time_stats()
     
     return {
-        "media_ms": round(sum(tempos) / len(tempos) if tempos else 0, 2),
-        "minimo_ms": min(tempos) if tempos else 0,
-        "maximo_ms": max(tempos) if tempos else 0,
-        "total_processamentos": len(tempos)
+        "media_ms": round(stats["media_ms"], 2),
+        "minimo_ms": stats["minimo_ms"],
+        "maximo_ms": stats["maximo_ms"],
+        "total_processamentos": stats["total_processamentos"]
     }
 
 
 @router.get("/top-policies", response_model=List[Dict])
-async def get_top_policies(limit: int = Query(5, ge=1, le=20)):
+async def get_top_policies(
+    limit: int = Query(5, ge=1, le=20),
+    repository: ProcessoRepository = Depends(get_repository)
+):
     """
     Return the most impactful policies.
     
@@ -134,7 +146,7 @@ async def get_top_policies(limit: int = Query(5, ge=1, le=20)):
     usage = repository.get_policy_usage()
     top_policies = []
     
-    for policy_id, count in list(usage.items())[:limit]:
+    for policy_id, count in heapq.nlargest(limit, usage.items(), key=itemgetter(1)):
         try:
             policy = get_policy_by_id(policy_id)
             top_policies.append({
@@ -156,14 +168,16 @@ async def get_top_policies(limit: int = Query(5, ge=1, le=20)):
 
 
 @router.get("/decision-by-sphere", response_model=Dict[str, Dict])
-async def get_decision_by_sphere():
+async def get_decision_by_sphere(
+    repository: ProcessoRepository = Depends(get_repository)
+):
     """
     Return decision distribution by judicial sphere.
     
     Analyzes how the system behaves in different
     judicial contexts (Federal, State, Labor).
     """
-    verificacoes = repository.get_all()
+    total = repository.count()
     
     # Group by sphere (would need to store this)
     # For now, return generic structure
@@ -171,7 +185,7 @@ async def get_decision_by_sphere():
     
     logger.info(
         "Decisions by sphere consulted",
-        extra={"extra_data": {"total": len(verificacoes)}}
+        extra={"extra_data": {"total": total}}
     )
     
     return {
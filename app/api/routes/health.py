@@ -1,6 +1,10 @@
-from fastapi import APIRouter
+import logging
+from functools import lru_cache
+from fastapi import APIRouter, Request
 from pydantic import BaseModel
 from datetime import datetime
+from app.api.etag import Encoded, encode, etag_response
+from app.utils.clock import utc_now
 from app.utils.logger import get_logger
 
 
@@ -16,12 +20,19 @@ class HealthResponse(BaseModel):
     version: str = "1.0.0"
 
 
-@router.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Check application health."""
-    logger.info("Health check performed")
-    return {
+@lru_cache(maxsize=1)
+def _health_body(timestamp: datetime) -> Encoded:
+    """Pre-encoded body, reused while the cached clock stays on a second."""
+    return encode({
         "status": "healthy",
-        "timestamp": datetime.utcnow(),
+        "timestamp": timestamp,
         "version": "1.0.0"
-    }
\ No newline at end of file
+    })
+
+
+@router.get("/health", response_model=HealthResponse)
+async def health_check(request: Request):
+    """Check application health."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Health check performed")
+    return etag_response(request, _health_body(utc_now()))
\ No newline at end of file
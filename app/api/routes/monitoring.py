@@ -1,10 +1,13 @@
 """
 Monitoring and status routes for API credits and cache.
 """
-from fastapi import APIRouter, status
+from functools import lru_cache
+from fastapi import APIRouter, Depends, Request, status
+from app.api.etag import Encoded, encode, etag_response
 from app.utils.logger import get_logger
 from app.utils.cache import verification_cache
-from app.config import settings
+from app.external.llm_service import get_llm_service
+from app.config import Settings, get_settings
 
 logger = get_logger("monitoring")
 
@@ -12,18 +15,19 @@ router = APIRouter(prefix="/monitoring", tags=["monitoring"])
 
 
 @router.get("/cache-stats")
-async def get_cache_stats():
+async def get_cache_stats(request: Request):
     """
     Get cache statistics.
     
     Returns info about cached verifications and performance.
     """
     stats = verification_cache.get_stats()
-    return {
+    return etag_response(request, {
         "status": "success",
         "cache": stats,
+        "llm_response_cache": get_llm_service().get_response_cache_stats(),
         "message": f"{stats['total_entries']} processos em cache"
-    }
+    })
 
 
 @router.post("/cache/clear")
@@ -34,6 +38,7 @@ async def clear_cache():
     Use this if you want to force fresh API calls.
     """
     verification_cache.clear()
+    get_llm_service().clear_response_cache()
     logger.info("Cache cleared by user request")
     return {
         "status": "success",
@@ -42,7 +47,10 @@ async def clear_cache():
 
 
 @router.get("/api-status")
-async def get_api_status():
+async def get_api_status(
+    request: Request,
+    settings: Settings = Depends(get_settings)
+):
     """
     Get API configuration and credit usage status.
     
@@ -56,7 +64,7 @@ async def get_api_status():
     
     cache_stats = verification_cache.get_stats()
     
-    return {
+    return etag_response(request, {
         "status": "operational",
         "api": {
             "provider": "Groq",
@@ -73,17 +81,33 @@ async def get_api_status():
             "💰 Monitore seu uso em https://console.groq.com/",
             "⚠️  Se receber erro 429, seus créditos foram esgotados"
         ]
-    }
+    }, stale_while_revalidate=30)
 
 
-@router.get("/health")
-async def health_check():
+@lru_cache(maxsize=2)
+def _health_body(api_key_configured: bool) -> Encoded:
+    """Pre-encoded /monitoring/health body."""
+    return encode({
+        "status": "healthy",
+        "service": "LLM Verification API",
+        "api_key_configured": api_key_configured
+    })
+
+
+# Polling variant of /health, kept for existing clients but not documented
+@router.get("/health", include_in_schema=False)
+async def health_check(
+    request: Request,
+    settings: Settings = Depends(get_settings)
+):
     """
     Simple health check endpoint.
     """
-    return {
-        "status": "healthy",
-        "service": "LLM Verification API",
-        "api_key_configured": bool(settings.groq_api_key)
-    }
+    # Only changes with configuration, so pollers can keep it longer
+    return etag_response(
+        request,
+        _health_body(bool(settings.groq_api_key)),
+        max_age=30,
+        stale_while_revalidate=30
+    )
 
@@ -1,22 +1,26 @@
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from itertools import islice
 from typing import List, Optional
 from datetime import datetime, timedelta
 from app.schemas.responses import (
     VerificacaoResponseSchema,
     ProcessoHistoricoSchema
 )
-from app.repositories.process_repository import get_repository
+from app.domain.policies import Decision
+from app.repositories.process_repository import ProcessoRepository, get_repository
 from app.utils.logger import get_logger
 
 
 logger = get_logger("process_route")
 
 router = APIRouter(prefix="/process", tags=["process"])
-repository = get_repository()
 
 
 @router.get("/{numero_processo}", response_model=ProcessoHistoricoSchema)
-async def get_process_history(numero_processo: str):
+async def get_process_history(
+    numero_processo: str,
+    repository: ProcessoRepository = Depends(get_repository)
+):
     """
     Return history of all verifications of a process.
     
@@ -65,7 +69,8 @@ async def get_process_history(numero_processo: str):
 async def list_processes(
     decision: Optional[str] = Query(None, description="Filter by decision (approved/rejected/incomplete)"),
     limit: int = Query(100, ge=1, le=1000, description="Limit of results"),
-    offset: int = Query(0, ge=0, description="Number of items to skip")
+    offset: int = Query(0, ge=0, description="Number of items to skip"),
+    repository: ProcessoRepository = Depends(get_repository)
 ):
     """
     List verifications with optional filters.
@@ -77,12 +82,16 @@ async def list_processes(
     """
     try:
         if decision:
-            verificacoes = repository.get_by_decision(decision)
+            # Unknown values raise ValueError (400) instead of matching nothing
+            resultado = Decision(decision)
+            verificacoes = repository.iter_by_decision(resultado)
+            total = repository.count_by_decision(resultado)
         else:
-            verificacoes = repository.get_all()
+            verificacoes = repository.iter_all()
+            total = repository.count()
         
-        # Apply pagination
-        paginadas = verificacoes[offset:offset + limit]
+        # Apply pagination without materializing the full result set
+        paginadas = islice(verificacoes, offset, offset + limit)
         
         # Convert to response schemas
         resultados = [
@@ -101,7 +110,7 @@ async def list_processes(
         logger.info(
             "List of processes consulted",
             extra={"extra_data": {
-                "total": len(verificacoes),
+                "total": total,
                 "retornados": len(resultados),
                 "decision_filter": decision
             }}
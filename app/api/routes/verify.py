@@ -1,16 +1,19 @@
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
-from typing import Optional
-import uuid
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi.responses import Response, StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import logging
+from contextlib import aclosing
+import orjson
 from app.schemas.responses import (
     ProcessoInputSchema,
     VerificacaoResponseSchema,
     BatchVerificacaoRequestSchema,
     BatchVerificacaoResponseSchema
 )
-from app.use_cases.verify_process import VerifyProcessUseCase
-from app.external.llm_service import LLMService, APICreditsExhaustedError, APIAuthenticationError
-from app.repositories.process_repository import get_repository
+from app.use_cases.verify_process import VerifyProcessUseCase, get_verify_use_case
+from app.external.llm_service import APICreditsExhaustedError, APIAuthenticationError
 from app.external.langsmith_client import langsmith_client
+from app.utils.ids import new_id
 from app.utils.logger import get_logger
 from app.utils.cache import verification_cache
 import time
@@ -18,18 +21,17 @@ import time
 
 logger = get_logger("verify_route")
 
-router = APIRouter(prefix="/verify", tags=["verification"])
+_perf_ns = time.perf_counter_ns
 
-# Shared instances
-llm_service = LLMService()
-verify_use_case = VerifyProcessUseCase(llm_service)
+router = APIRouter(prefix="/verify", tags=["verification"])
 
 
 @router.post("/", response_model=VerificacaoResponseSchema)
 async def verify_process(
     processo: ProcessoInputSchema,
-    request_id: Optional[str] = None
-) -> VerificacaoResponseSchema:
+    request_id: Optional[str] = None,
+    verify_use_case: VerifyProcessUseCase = Depends(get_verify_use_case)
+) -> Response:
     """
     Verify a judicial process.
     
@@ -42,7 +44,7 @@ async def verify_process(
     with justification based on company policies.
     """
     if not request_id:
-        request_id = str(uuid.uuid4())
+        request_id = new_id()
     
     try:
         logger.info(
@@ -53,32 +55,18 @@ async def verify_process(
             }}
         )
         
-        # Convert schema to dict to pass to use case
-        processo_dict = processo.model_dump()
-        
-        # 🚀 Check cache first to avoid unnecessary API calls
-        cached_result = verification_cache.get(processo_dict)
-        if cached_result:
-            logger.info(
-                "Returning cached verification result",
-                extra={"extra_data": {
-                    "request_id": request_id,
-                    "numero_processo": processo.numeroProcesso,
-                    "from_cache": True
-                }}
-            )
-            return cached_result
-        
-        # Execute use case
+        # Execute use case (serves repeated submissions from the cache)
         resultado = await verify_use_case.execute(
-            processo_dict,
+            processo.model_dump(),
             request_id=request_id
         )
         
-        # Cache the result for future requests
-        verification_cache.set(processo_dict, resultado)
-        
-        return resultado
+        # Already validated: skip FastAPI's response_model re-validation;
+        # cache hits reuse the body serialized on the first response
+        return Response(
+            content=resultado.json_bytes(),
+            media_type="application/json"
+        )
     
     except APICreditsExhaustedError as e:
         logger.error(
@@ -141,127 +129,264 @@ async def verify_process(
         )
 
 
-@router.post("/batch", response_model=BatchVerificacaoResponseSchema)
-async def verify_batch(
-    batch_request: BatchVerificacaoRequestSchema,
-    background_tasks: BackgroundTasks
-) -> BatchVerificacaoResponseSchema:
+@router.post("/stream")
+async def verify_process_stream(
+    processo: ProcessoInputSchema,
+    request_id: Optional[str] = None,
+    verify_use_case: VerifyProcessUseCase = Depends(get_verify_use_case)
+) -> StreamingResponse:
     """
-    Verify multiple processes in batch.
+    Verify a judicial process, streaming the LLM reply as NDJSON.
     
-    Process up to 50 processes simultaneously.
-    Return aggregated result with statistics.
+    Each line is `{"partial": {...}}` with the reply parsed so far; the
+    last line is `{"result": {...}}` or `{"error": "..."}`.
     """
-    batch_id = str(uuid.uuid4())
+    if not request_id:
+        request_id = new_id()
     
-    logger.info(
-        "Batch request received",
-        extra={"extra_data": {
-            "batch_id": batch_id,
-            "total": len(batch_request.processos)
-        }}
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Streamed verification request received",
+            extra={"extra_data": {
+                "request_id": request_id,
+                "numero_processo": processo.numeroProcesso
+            }}
+        )
     
-    start_time = time.time()
-    resultados = []
-    erros = 0
-    cached_count = 0
-    api_calls = 0
-    api_error: Optional[str] = None
+    processo_data = processo.model_dump()
     
-    for processo in batch_request.processos:
+    async def _ndjson() -> AsyncIterator[bytes]:
         try:
-            request_id = f"{batch_id}-{len(resultados)}"
-            processo_dict = processo.model_dump()
-            
-            # 🚀 Check cache first
-            cached_result = verification_cache.get(processo_dict)
-            if cached_result:
-                resultados.append(cached_result)
-                cached_count += 1
-                continue
-            
-            # Make API call only if not cached
-            api_calls += 1
-            resultado = await verify_use_case.execute(
-                processo_dict,
+            async for done, data in verify_use_case.execute_stream(
+                processo_data,
                 request_id=request_id
-            )
-            resultados.append(resultado)
-            
-            # Cache for future use
-            verification_cache.set(processo_dict, resultado)
-        
-        except APICreditsExhaustedError as e:
-            logger.error(
-                "API Credits Exhausted in batch",
-                extra={"extra_data": {
-                    "batch_id": batch_id,
-                    "erro_indice": len(resultados)
-                }}
-            )
-            api_error = str(e)
-            erros += 1
-            break  # Stop processing batch when credits are exhausted
-        
-        except APIAuthenticationError as e:
-            logger.error(
-                "API Authentication Failed in batch",
-                extra={"extra_data": {
-                    "batch_id": batch_id,
-                    "erro_indice": len(resultados)
-                }}
-            )
-            api_error = str(e)
-            erros += 1
-            break  # Stop processing batch
-        
+            ):
+                if done:
+                    yield b'{"result":' + data.json_bytes() + b"}\n"
+                else:
+                    yield orjson.dumps({"partial": data}) + b"\n"
         except Exception as e:
-            logger.error(
-                "Error processing process in batch",
-                extra={"extra_data": {
-                    "batch_id": batch_id,
-                    "erro_indice": len(resultados),
-                    "error": str(e)
-                }}
-            )
-            erros += 1
+            # Status line is already sent, report the failure in-band
+            yield orjson.dumps({"error": str(e)}) + b"\n"
+    
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+
+async def _iter_batch(
+    verify_use_case: VerifyProcessUseCase,
+    batch_id: str,
+    processos_dicts: List[Dict[str, Any]],
+    counters: Dict[str, int]
+) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Verify a batch yielding (index, outcome) pairs as they complete.
+    
+    Cache hits are yielded first, misses go through a single LLM batch
+    (`chain.abatch_as_completed`) bounded by `settings.batch_concurrency`. The outcome
+    is the verification result or the exception raised for that item;
+    consumption stops at the first credits/authentication failure.
+    """
+    # 🚀 Check cache in bulk, only misses go to the API.
+    # Identical processes in the same batch share a single API call.
+    misses: Dict[int, List[int]] = {}
+    for idx, (cached_result, processo_dict) in enumerate(
+        zip(verification_cache.get_many(processos_dicts), processos_dicts)
+    ):
+        if cached_result:
+            counters["cached"] += 1
+            yield idx, cached_result
+        else:
+            key = verification_cache.make_key(processo_dict)
+            misses.setdefault(key, []).append(idx)
+    
+    if not misses:
+        return
+    
+    groups = list(misses.values())
+    to_cache = []
+    try:
+        async with aclosing(verify_use_case.execute_many(
+            [processos_dicts[indices[0]] for indices in groups],
+            [f"{batch_id}-{indices[0]}" for indices in groups]
+        )) as outcomes:
+            async for pos, outcome in outcomes:
+                counters["api_calls"] += 1
+                indices = groups[pos]
+                if not isinstance(outcome, Exception):
+                    to_cache.append((processos_dicts[indices[0]], outcome))
+                for idx in indices:
+                    yield idx, outcome
+                
+                # Skip remaining work once credits/auth failed
+                if isinstance(outcome, (APICreditsExhaustedError, APIAuthenticationError)):
+                    break
+    finally:
+        # Cache for future use
+        verification_cache.set_many(to_cache)
+
+
+def _record_batch_error(
+    errors_summary: List[Dict[str, Any]],
+    batch_id: str,
+    idx: int,
+    error: Exception
+) -> Optional[str]:
+    """
+    Record a failed batch item for the terminal batch log.
     
-    tempo_total_ms = int((time.time() - start_time) * 1000)
+    Returns the error message for API-level (credits/auth) errors.
+    """
+    errors_summary.append({
+        "idx": idx,
+        "type": type(error).__name__,
+        "msg": str(error)[:200]
+    })
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Error processing process in batch",
+            extra={"extra_data": {
+                "batch_id": batch_id,
+                "erro_indice": idx,
+                "error": str(error)
+            }}
+        )
+    
+    if isinstance(error, (APICreditsExhaustedError, APIAuthenticationError)):
+        return str(error)
+    return None
+
+
+def _finish_batch(
+    batch_id: str,
+    total: int,
+    processados: int,
+    errors_summary: List[Dict[str, Any]],
+    counters: Dict[str, int],
+    start_ns: int
+) -> int:
+    """Register batch completion in a single record and return total time in ms."""
+    tempo_total_ms = (_perf_ns() - start_ns) // 1_000_000
+    erros = len(errors_summary)
     
     # Register in LangSmith
     langsmith_client.log_batch_verification(
         batch_id=batch_id,
-        total=len(batch_request.processos),
-        processados=len(resultados),
+        total=total,
+        processados=processados,
         erros=erros,
         tempo_total_ms=tempo_total_ms
     )
     
-    logger.info(
-        "Batch verification completed",
-        extra={"extra_data": {
-            "batch_id": batch_id,
-            "total": len(batch_request.processos),
-            "processados": len(resultados),
-            "erros": erros,
-            "cached": cached_count,
-            "api_calls": api_calls,
-            "tempo_total_ms": tempo_total_ms
-        }}
+    extra_data = {
+        "batch_id": batch_id,
+        "total": total,
+        "processados": processados,
+        "erros": erros,
+        "cached": counters["cached"],
+        "api_calls": counters["api_calls"],
+        "tempo_total_ms": tempo_total_ms
+    }
+    
+    if errors_summary:
+        extra_data["errors"] = errors_summary
+        logger.warning("Batch verification completed with errors", extra={"extra_data": extra_data})
+    else:
+        logger.info("Batch verification completed", extra={"extra_data": extra_data})
+    
+    return tempo_total_ms
+
+
+@router.post("/batch", response_model=BatchVerificacaoResponseSchema)
+async def verify_batch(
+    batch_request: BatchVerificacaoRequestSchema,
+    background_tasks: BackgroundTasks,
+    verify_use_case: VerifyProcessUseCase = Depends(get_verify_use_case)
+) -> BatchVerificacaoResponseSchema:
+    """
+    Verify multiple processes in batch.
+    
+    Process up to 50 processes simultaneously.
+    Return aggregated result with statistics.
+    """
+    batch_id = new_id()
+    total = len(batch_request.processos)
+    start_ns = _perf_ns()
+    counters = {"cached": 0, "api_calls": 0}
+    processos_dicts = [processo.model_dump() for processo in batch_request.processos]
+    
+    outcomes: Dict[int, Any] = {}
+    async for idx, outcome in _iter_batch(verify_use_case, batch_id, processos_dicts, counters):
+        outcomes[idx] = outcome
+    
+    resultados = []
+    errors_summary: List[Dict[str, Any]] = []
+    api_error: Optional[str] = None
+    for idx in sorted(outcomes):
+        outcome = outcomes[idx]
+        if isinstance(outcome, Exception):
+            api_error = _record_batch_error(errors_summary, batch_id, idx, outcome) or api_error
+        else:
+            resultados.append(outcome)
+    
+    tempo_total_ms = _finish_batch(
+        batch_id, total, len(resultados), errors_summary, counters, start_ns
     )
     
-    response = BatchVerificacaoResponseSchema(
+    return BatchVerificacaoResponseSchema(
         batch_id=batch_id,
-        total=len(batch_request.processos),
+        total=total,
         processados=len(resultados),
-        erros=erros,
+        erros=len(errors_summary),
         resultados=resultados,
-        tempo_total_ms=tempo_total_ms
+        tempo_total_ms=tempo_total_ms,
+        # Add error info if API failed
+        api_error=api_error
     )
+
+
+@router.post("/batch/stream")
+async def verify_batch_stream(
+    batch_request: BatchVerificacaoRequestSchema,
+    verify_use_case: VerifyProcessUseCase = Depends(get_verify_use_case)
+) -> StreamingResponse:
+    """
+    Verify multiple processes in batch, streaming results as NDJSON.
+    
+    Each line is `{"index": i, "result": {...}}` or `{"index": i, "error": "..."}`
+    in completion order; the last line is the batch summary.
+    """
+    batch_id = new_id()
+    total = len(batch_request.processos)
+    processos_dicts = [processo.model_dump() for processo in batch_request.processos]
     
-    # Add error info if API failed
-    if api_error:
-        response.api_error = api_error
+    async def _ndjson() -> AsyncIterator[bytes]:
+        start_ns = _perf_ns()
+        counters = {"cached": 0, "api_calls": 0}
+        processados = 0
+        errors_summary: List[Dict[str, Any]] = []
+        api_error: Optional[str] = None
+        
+        async for idx, outcome in _iter_batch(verify_use_case, batch_id, processos_dicts, counters):
+            if isinstance(outcome, Exception):
+                api_error = _record_batch_error(errors_summary, batch_id, idx, outcome) or api_error
+                line = {"index": idx, "error": str(outcome)}
+            else:
+                processados += 1
+                line = {"index": idx, "result": outcome.model_dump(mode="json")}
+            yield orjson.dumps(line) + b"\n"
+        
+        tempo_total_ms = _finish_batch(
+            batch_id, total, processados, errors_summary, counters, start_ns
+        )
+        
+        yield orjson.dumps({
+            "batch_id": batch_id,
+            "total": total,
+            "processados": processados,
+            "erros": len(errors_summary),
+            "tempo_total_ms": tempo_total_ms,
+            "api_error": api_error
+        }) + b"\n"
     
-    return response
\ No newline at end of file
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
@@ -1,7 +1,8 @@
 import os
-from typing import Literal
+from functools import lru_cache
+from typing import List, Literal
 from pydantic import Field
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -18,11 +19,16 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
     reload: bool = True
+    workers: int = 1
+    cors_allowed_origins: List[str] = ["http://localhost:8501"]
     
     # Groq API (ChatGPT)
     groq_api_key: str = Field(default="", alias="GROQ_API_KEY")
     groq_model: str = Field(default="llama-3.1-8b-instant", alias="GROQ_MODEL")
     max_tokens: int = 2000
+    llm_response_cache_size: int = 1024
+    llm_response_cache_ttl_minutes: int = 60
+    llm_max_doc_chars: int = 4000
     
     
     # LangSmith
@@ -34,20 +40,32 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     log_format: str = "json"
     
+    # Profiling (?profile=1 returns a pyinstrument report)
+    enable_profiler: bool = False
+    
     # Database (TODO: Implement)
     database_url: str = "sqlite:///./juscash.db"
     
     # Limits
     max_batch_size: int = 50
+    batch_concurrency: int = 8
     max_request_timeout: int = 30
     
     # Policy (TODO: Implement)
     min_valor_condenacao: float = 1000.00
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        frozen=True
+    )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Factory to get singleton instance of the settings."""
+    return Settings()
 
 
 # Global instance
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
@@ -1,5 +1,6 @@
+import sys
 from enum import Enum
-from typing import NamedTuple, List
+from typing import Dict, List, NamedTuple, Tuple
 
 
 class Decision(str, Enum):
@@ -17,7 +18,7 @@ class PolicyRule(NamedTuple):
     category: str
 
 
-POLICIES: List[PolicyRule] = [
+POLICIES: Tuple[PolicyRule, ...] = (
     PolicyRule(
         id="POL-1",
         title="Elegibilidade - Trânsito em Julgado",
@@ -66,17 +67,31 @@ POLICIES: List[PolicyRule] = [
         description="Se faltar documento essencial (ex.: trânsito em julgado não comprovado) → incomplete",
         category="documentacao"
     ),
-]
+)
+
+# Intern ids and categories so index lookups and category comparisons
+# against the same strings short-circuit on identity
+POLICIES = tuple(
+    policy._replace(id=sys.intern(policy.id), category=sys.intern(policy.category))
+    for policy in POLICIES
+)
+
+
+_POLICIES_BY_ID: Dict[str, PolicyRule] = {policy.id: policy for policy in POLICIES}
+
+_POLICIES_BY_CATEGORY: Dict[str, Tuple[PolicyRule, ...]] = {}
+for _policy in POLICIES:
+    _POLICIES_BY_CATEGORY[_policy.category] = _POLICIES_BY_CATEGORY.get(_policy.category, ()) + (_policy,)
 
 
 def get_policy_by_id(policy_id: str) -> PolicyRule:
     """Retrieve a policy by ID."""
-    for policy in POLICIES:
-        if policy.id == policy_id:
-            return policy
-    raise ValueError(f"Policy {policy_id} not found")
+    try:
+        return _POLICIES_BY_ID[policy_id]
+    except KeyError:
+        raise ValueError(f"Policy {policy_id} not found") from None
 
 
 def get_policies_by_category(category: str) -> List[PolicyRule]:
     """Retrieve policies by category."""
-    return [p for p in POLICIES if p.category == category]
\ No newline at end of file
+    return list(_POLICIES_BY_CATEGORY.get(category, ()))
@@ -0,0 +1,50 @@
+from typing import Any, Dict
+
+# Marker placed where the middle of a long document text was cut
+_ELLIPSIS = "\n[...]\n"
+
+# Document fields the verification prompt never relies on
+_DROPPED_DOCUMENT_FIELDS = ("id",)
+
+
+def _slim_texto(texto: str, max_doc_chars: int) -> str:
+    """Keep the beginning and end of a document text within max_doc_chars."""
+    if len(texto) <= max_doc_chars:
+        return texto
+    
+    # Headers (parties, document type) sit at the start and the
+    # dispositive part at the end, so keep both halves
+    head = max_doc_chars // 2
+    tail = max_doc_chars - head
+    return texto[:head] + _ELLIPSIS + texto[-tail:]
+
+
+def slim_processo(processo_data: Dict[str, Any], max_doc_chars: int = 4000) -> Dict[str, Any]:
+    """
+    Reduce a process payload to what the verification prompt needs.
+    
+    Args:
+        processo_data: Process data
+        max_doc_chars: Maximum characters kept from each document text
+    
+    Returns:
+        Shallow copy of the process with trimmed documents
+    """
+    documentos = processo_data.get("documentos")
+    if not documentos:
+        return processo_data
+    
+    return {
+        **processo_data,
+        "documentos": [
+            {
+                **{
+                    key: value
+                    for key, value in documento.items()
+                    if key not in _DROPPED_DOCUMENT_FIELDS
+                },
+                "texto": _slim_texto(documento.get("texto") or "", max_doc_chars),
+            }
+            for documento in documentos
+        ],
+    }
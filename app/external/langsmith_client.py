@@ -1,5 +1,5 @@
-import os
-from typing import Optional, Dict, Any
+import logging
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from app.config import settings
 from app.utils.logger import get_logger
@@ -15,10 +15,19 @@ class LangSmithClient:
         self.enabled = settings.enable_langsmith and bool(settings.langsmith_api_key)
         self.project_name = settings.langsmith_project_name
         
+        self.client = None
+        # Callbacks handed to chain calls; tracing is configured in-process
+        # instead of through LANGCHAIN_* environment variables
+        self.callbacks: List[Any] = []
+        
         if self.enabled:
-            os.environ["LANGCHAIN_API_KEY"] = settings.langsmith_api_key
-            os.environ["LANGCHAIN_PROJECT"] = self.project_name
-            os.environ["LANGCHAIN_TRACING_V2"] = "true"
+            from langsmith import Client
+            from langchain_core.tracers import LangChainTracer
+            
+            self.client = Client(api_key=settings.langsmith_api_key)
+            self.callbacks.append(
+                LangChainTracer(project_name=self.project_name, client=self.client)
+            )
             
             logger.info(
                 "LangSmith habilitado",
@@ -54,15 +63,16 @@ class LangSmithClient:
         try:
             # Here it would be integrated with LangChain/LangSmith
             # For now, only logging
-            logger.info(
-                "Verification registered in LangSmith",
-                extra={"extra_data": {
-                    "numero_processo": numero_processo,
-                    "decision": output_data.get("decision"),
-                    "model": model_used,
-                    "processing_time_ms": processing_time_ms
-                }}
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Verification registered in LangSmith",
+                    extra={"extra_data": {
+                        "numero_processo": numero_processo,
+                        "decision": output_data.get("decision"),
+                        "model": model_used,
+                        "processing_time_ms": processing_time_ms
+                    }}
+                )
             return None  # Placeholder for run ID
         
         except Exception as e:
@@ -85,16 +95,17 @@ class LangSmithClient:
             return
         
         try:
-            logger.info(
-                "Batch registered in LangSmith",
-                extra={"extra_data": {
-                    "batch_id": batch_id,
-                    "total": total,
-                    "processados": processados,
-                    "erros": erros,
-                    "tempo_total_ms": tempo_total_ms
-                }}
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Batch registered in LangSmith",
+                    extra={"extra_data": {
+                        "batch_id": batch_id,
+                        "total": total,
+                        "processados": processados,
+                        "erros": erros,
+                        "tempo_total_ms": tempo_total_ms
+                    }}
+                )
         except Exception as e:
             logger.error(
                 "Error registering batch in LangSmith",
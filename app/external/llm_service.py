@@ -2,24 +2,44 @@
 LLM Service - LangChain wrapper for Groq with structured JSON output
 Using Groq API for high-speed LLM inference
 """
-import json
+import asyncio
+import hashlib
+import logging
 import time
-from typing import Dict, Any, Optional
+import orjson
+import httpx
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 from langchain_groq import ChatGroq
-from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.exceptions import OutputParserException
 from groq import RateLimitError, AuthenticationError
 
 from app.config import settings
+from app.external.langsmith_client import langsmith_client
 from app.utils.logger import get_logger
 from app.domain.policies import POLICIES
+from app.domain.preprocess import slim_processo
 
 
 logger = get_logger("llm_service")
 
 
+# Policies never change at runtime: render their prompt context once
+_POLICIES_CONTEXT = "".join(
+    f"## {policy.id}: {policy.title}\n"
+    f"**Categoria**: {policy.category}\n"
+    f"**Descrição**: {policy.description}\n\n"
+    for policy in POLICIES
+)
+
+# Placeholder marking where processo_json goes in the rendered prompt
+_PROCESSO_SLOT = "\x00processo_json\x00"
+
+
 class APICreditsExhaustedError(Exception):
     """Raised when API has exhausted credits/rate limit."""
     pass
@@ -39,13 +59,29 @@ class LLMService:
         """
         Initialize LLM Service with LangChain + Groq
         """
+        # Keep-alive pool shared by every call made through this service
+        self.http_async_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128)
+        )
         self.llm = ChatGroq(
             model=settings.groq_model,
             api_key=settings.groq_api_key,
             temperature=0.1,
-            max_tokens=settings.max_tokens
+            max_tokens=settings.max_tokens,
+            # JSON mode: Groq guarantees a syntactically valid JSON object
+            model_kwargs={"response_format": {"type": "json_object"}},
+            http_async_client=self.http_async_client
         )
         self._prompt_version = "1.0-groq"
+        # LRU of (monotonic deadline, LLM result) keyed by a hash of the
+        # exact prompt input
+        self._response_cache: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._response_cache_ttl = settings.llm_response_cache_ttl_minutes * 60
+        self._response_cache_hits = 0
+        self._response_cache_misses = 0
+        # Chain calls currently running, keyed like the response cache
+        self._in_flight: Dict[bytes, "asyncio.Task[Dict[str, Any]]"] = {}
         self._setup_chain()
     
     def _setup_chain(self):
@@ -84,70 +120,136 @@ Avalie se o processo deve ser adquirido conforme políticas.
 }}
 """
         
-        self.prompt = PromptTemplate(
-            input_variables=["policies_context", "processo_json"],
-            template=prompt_template
+        # Policies are constant: render the template once and keep the text
+        # around processo_json, so each request is a plain concatenation
+        rendered = prompt_template.format(
+            policies_context=_POLICIES_CONTEXT,
+            processo_json=_PROCESSO_SLOT
         )
+        self._prompt_head, self._prompt_tail = rendered.split(_PROCESSO_SLOT)
+        self.prompt = RunnableLambda(self._render_prompt)
         
         self.parser = JsonOutputParser()
         
         # Create chain: prompt -> llm -> parser
         self.chain = self.prompt | self.llm | self.parser
     
-    def _build_policies_context(self) -> str:
-        """Build policies context in a readable format."""
-        context = ""
+    async def _ainvoke_bounded(
+        self,
+        chain_input: Dict[str, str],
+        config: RunnableConfig
+    ) -> Dict[str, Any]:
+        """Invoke the chain for one input within settings.max_request_timeout."""
+        async with asyncio.timeout(settings.max_request_timeout):
+            return await self.chain.ainvoke(chain_input, config=config)
+    
+    def _render_prompt(self, chain_input: Dict[str, str]) -> str:
+        """Build the prompt text for one chain input."""
+        return self._prompt_head + chain_input["processo_json"] + self._prompt_tail
+    
+    def _build_input(self, processo_data: Dict[str, Any]) -> Dict[str, str]:
+        """Build the chain input for a process."""
+        processo_json = orjson.dumps(
+            slim_processo(processo_data, settings.llm_max_doc_chars),
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+        return {"processo_json": processo_json}
+    
+    def _response_key(self, chain_input: Dict[str, str]) -> bytes:
+        """Stable hash of the prompt input used as response cache key."""
+        return hashlib.blake2b(
+            chain_input["processo_json"].encode("utf-8"), digest_size=16
+        ).digest()
+    
+    def _get_cached_response(
+        self,
+        key: bytes,
+        processing_time: int
+    ) -> Optional[Dict[str, Any]]:
+        """Return a copy of a cached LLM result, refreshing its LRU position."""
+        entry = self._response_cache.get(key)
+        if entry is None:
+            self._response_cache_misses += 1
+            return None
         
-        for policy in POLICIES:
-            context += f"## {policy.id}: {policy.title}\n"
-            context += f"**Categoria**: {policy.category}\n"
-            context += f"**Descrição**: {policy.description}\n\n"
+        expires_at, cached = entry
+        if time.monotonic() > expires_at:
+            del self._response_cache[key]
+            self._response_cache_misses += 1
+            return None
         
-        return context
+        self._response_cache_hits += 1
+        self._response_cache.move_to_end(key)
+        return {**cached, "processing_time_ms": processing_time}
     
-    async def verify_process(
+    def _cache_response(self, key: bytes, verification: Dict[str, Any]) -> None:
+        """Store an LLM result, evicting the least recently used entry."""
+        self._response_cache[key] = (
+            time.monotonic() + self._response_cache_ttl,
+            verification
+        )
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > settings.llm_response_cache_size:
+            self._response_cache.popitem(last=False)
+    
+    def clear_response_cache(self) -> None:
+        """Clear cached LLM results and their statistics."""
+        self._response_cache.clear()
+        self._response_cache_hits = 0
+        self._response_cache_misses = 0
+    
+    def get_response_cache_stats(self) -> Dict[str, Any]:
+        """Get LLM response cache statistics."""
+        lookups = self._response_cache_hits + self._response_cache_misses
+        return {
+            "total_entries": len(self._response_cache),
+            "max_entries": settings.llm_response_cache_size,
+            "ttl_minutes": settings.llm_response_cache_ttl_minutes,
+            "hits": self._response_cache_hits,
+            "misses": self._response_cache_misses,
+            "hit_rate": self._response_cache_hits / lookups if lookups else 0.0
+        }
+    
+    async def _run_chain(
         self,
-        processo_data: Dict[str, Any],
-        request_id: Optional[str] = None
+        chain_input: Dict[str, str],
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
-        Verify a judicial process against policies using LangChain + Anthropic
+        Run the chain for one input and return the parsed JSON object.
         
         Args:
-            processo_data: Process data
-            request_id: Unique request ID
+            chain_input: Prompt input built by _build_input
+            on_partial: Called with each partially parsed object as it streams
         
         Returns:
-            Dictionary with verification result
+            The complete parsed JSON object
         """
-        start_time = time.time()
+        # Stream the reply so JSON parsing overlaps with token delivery;
+        # the parser yields the cumulative object, the last one is complete
+        result = None
+        async with asyncio.timeout(settings.max_request_timeout):
+            async for partial in self.chain.astream(
+                chain_input,
+                config={"callbacks": langsmith_client.callbacks}
+            ):
+                result = partial
+                if on_partial is not None:
+                    on_partial(partial)
         
-        try:
-            # Format inputs
-            policies_context = self._build_policies_context()
-            processo_json = json.dumps(processo_data, indent=2, default=str, ensure_ascii=False)
-            
-            logger.info(
-                "Starting LLM verification with Groq",
-                extra={"extra_data": {
-                    "request_id": request_id,
-                    "numero_processo": processo_data.get("numeroProcesso"),
-                    "llm_framework": "groq"
-                }}
-            )
-            
-            # Run chain (invoke is sync, but we're in async context)
-            result = self.chain.invoke({
-                "policies_context": policies_context,
-                "processo_json": processo_json
-            })
-            
-            # Ensure result is a dict (parser returns dict)
-            if not isinstance(result, dict):
-                result = json.loads(str(result))
-            
-            processing_time = int((time.time() - start_time) * 1000)
-            
+        if result is None:
+            raise OutputParserException("LLM returned no parseable JSON")
+        return result
+    
+    def _build_result(
+        self,
+        result: Dict[str, Any],
+        processing_time: int,
+        request_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Normalize the parsed chain output into a verification result."""
+        if logger.isEnabledFor(logging.INFO):
             logger.info(
                 "LLM verification completed successfully",
                 extra={"extra_data": {
@@ -158,19 +260,26 @@ Avalie se o processo deve ser adquirido conforme políticas.
                     "llm_framework": "groq"
                 }}
             )
-            
-            return {
-                "decision": result.get("decision"),
-                "rationale": result.get("rationale"),
-                "citations": result.get("citations", []),
-                "confidence": result.get("confidence", 0.0),
-                "policy_analysis": result.get("policy_analysis", {}),
-                "processing_time_ms": processing_time,
-                "model_used": settings.groq_model,
-                "llm_framework": "groq"
-            }
-            
-        except OutputParserException as e:
+        
+        return {
+            "decision": result.get("decision"),
+            "rationale": result.get("rationale"),
+            "citations": result.get("citations", []),
+            "confidence": result.get("confidence", 0.0),
+            "policy_analysis": result.get("policy_analysis", {}),
+            "processing_time_ms": processing_time,
+            "model_used": settings.groq_model,
+            "llm_framework": "groq"
+        }
+    
+    def _translate_error(
+        self,
+        e: Exception,
+        processing_time: int,
+        request_id: Optional[str]
+    ) -> Exception:
+        """Log an LLM failure and return the exception to raise for it."""
+        if isinstance(e, OutputParserException):
             logger.error(
                 "Error parsing LLM response with Groq",
                 extra={"extra_data": {
@@ -179,13 +288,10 @@ Avalie se o processo deve ser adquirido conforme políticas.
                     "llm_framework": "groq"
                 }}
             )
-            raise ValueError(f"Invalid JSON response from LLM: {e}")
+            return ValueError(f"Invalid JSON response from LLM: {e}")
         
-        except RateLimitError as e:
+        if isinstance(e, RateLimitError):
             # Groq rate limit or quota exceeded
-            processing_time = int((time.time() - start_time) * 1000)
-            error_msg = str(e).lower()
-            
             logger.error(
                 "Groq Rate Limit/Credits Exceeded",
                 extra={"extra_data": {
@@ -196,14 +302,13 @@ Avalie se o processo deve ser adquirido conforme políticas.
                 }}
             )
             
-            raise APICreditsExhaustedError(
+            return APICreditsExhaustedError(
                 f"API de crédito esgotado. Motivo: {str(e)}. "
                 f"Por favor, adicione créditos à sua conta Groq ou aguarde o reset do rate limit."
             )
         
-        except AuthenticationError as e:
+        if isinstance(e, AuthenticationError):
             # Invalid API key or expired
-            processing_time = int((time.time() - start_time) * 1000)
             logger.error(
                 "Groq Authentication Failed",
                 extra={"extra_data": {
@@ -214,42 +319,265 @@ Avalie se o processo deve ser adquirido conforme políticas.
                 }}
             )
             
-            raise APIAuthenticationError(
+            return APIAuthenticationError(
                 "Falha na autenticação com a API Groq. "
                 "Verifique se a chave de API é válida e tem permissões ativas."
             )
         
-        except Exception as e:
-            processing_time = int((time.time() - start_time) * 1000)
-            error_str = str(e).lower()
-            
-            # Check for common API error patterns
-            if "quota" in error_str or "insufficient_quota" in error_str:
-                logger.error(
-                    "Groq Quota Exceeded",
-                    extra={"extra_data": {
-                        "request_id": request_id,
-                        "error": str(e),
-                        "processing_time_ms": processing_time,
-                        "error_type": "quota_error"
-                    }}
-                )
-                raise APICreditsExhaustedError(
-                    "Sua cota de crédito na API foi excedida. "
-                    "Adicione mais créditos ou aguarde a renovação mensal."
-                )
-            
+        error_str = str(e).lower()
+        
+        # Check for common API error patterns
+        if "quota" in error_str or "insufficient_quota" in error_str:
             logger.error(
-                "Unexpected error during LLM verification",
+                "Groq Quota Exceeded",
                 extra={"extra_data": {
                     "request_id": request_id,
                     "error": str(e),
                     "processing_time_ms": processing_time,
+                    "error_type": "quota_error"
+                }}
+            )
+            return APICreditsExhaustedError(
+                "Sua cota de crédito na API foi excedida. "
+                "Adicione mais créditos ou aguarde a renovação mensal."
+            )
+        
+        logger.error(
+            "Unexpected error during LLM verification",
+            extra={"extra_data": {
+                "request_id": request_id,
+                "error": str(e),
+                "processing_time_ms": processing_time,
+                "llm_framework": "groq"
+            }}
+        )
+        return e
+    
+    async def verify_process(
+        self,
+        processo_data: Dict[str, Any],
+        request_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Verify a judicial process against policies using LangChain + Groq
+        
+        Args:
+            processo_data: Process data
+            request_id: Unique request ID
+        
+        Returns:
+            Dictionary with verification result
+        """
+        start_ns = time.perf_counter_ns()
+        
+        try:
+            # Format inputs
+            chain_input = self._build_input(processo_data)
+            key = self._response_key(chain_input)
+            
+            cached = self._get_cached_response(
+                key, (time.perf_counter_ns() - start_ns) // 1_000_000
+            )
+            if cached is not None:
+                return cached
+            
+            # Identical concurrent requests share a single chain call
+            task = self._in_flight.get(key)
+            if task is None:
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "Starting LLM verification with Groq",
+                        extra={"extra_data": {
+                            "request_id": request_id,
+                            "numero_processo": processo_data.get("numeroProcesso"),
+                            "llm_framework": "groq"
+                        }}
+                    )
+                task = asyncio.ensure_future(self._run_chain(chain_input))
+                self._in_flight[key] = task
+                task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            
+            # Shielded so one cancelled caller does not abort the shared call
+            result = await asyncio.shield(task)
+            
+            processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
+            verification = self._build_result(result, processing_time, request_id)
+            self._cache_response(key, verification)
+            return verification
+            
+        except Exception as e:
+            processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
+            error = self._translate_error(e, processing_time, request_id)
+            if error is e:
+                raise
+            raise error
+    
+    async def stream_process(
+        self,
+        processo_data: Dict[str, Any],
+        request_id: Optional[str] = None
+    ) -> AsyncIterator[Tuple[bool, Dict[str, Any]]]:
+        """
+        Verify a process yielding the partially parsed reply as it streams.
+        
+        Args:
+            processo_data: Process data
+            request_id: Unique request ID
+        
+        Yields:
+            (done, data) pairs, where data is the JSON parsed so far while
+            done is False and the verification result on the last pair
+        """
+        start_ns = time.perf_counter_ns()
+        
+        try:
+            chain_input = self._build_input(processo_data)
+            key = self._response_key(chain_input)
+            
+            cached = self._get_cached_response(
+                key, (time.perf_counter_ns() - start_ns) // 1_000_000
+            )
+            if cached is not None:
+                yield True, cached
+                return
+            
+            task = self._in_flight.get(key)
+            if task is not None:
+                # Same input already running for another request: share it
+                result = await asyncio.shield(task)
+            else:
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "Starting streamed LLM verification with Groq",
+                        extra={"extra_data": {
+                            "request_id": request_id,
+                            "numero_processo": processo_data.get("numeroProcesso"),
+                            "llm_framework": "groq"
+                        }}
+                    )
+                
+                # The call runs as an in-flight task, so identical requests
+                # join it and a client disconnect (which closes this
+                # generator) does not abort it; partials reach this stream
+                # through a queue, None marks the end of the call
+                partials: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+                task = asyncio.ensure_future(
+                    self._run_chain(chain_input, partials.put_nowait)
+                )
+                self._in_flight[key] = task
+                task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+                task.add_done_callback(lambda _: partials.put_nowait(None))
+                
+                while (partial := await partials.get()) is not None:
+                    yield False, partial
+                result = task.result()
+            
+            processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
+            verification = self._build_result(result, processing_time, request_id)
+            self._cache_response(key, verification)
+            
+        except Exception as e:
+            processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
+            error = self._translate_error(e, processing_time, request_id)
+            if error is e:
+                raise
+            raise error
+        
+        yield True, verification
+    
+    async def verify_processes(
+        self,
+        processos_data: List[Dict[str, Any]],
+        request_ids: List[str]
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Verify several processes concurrently, bounded by
+        `settings.batch_concurrency`.
+        
+        Closing the generator cancels the calls that have not finished.
+        
+        Args:
+            processos_data: List of process data
+            request_ids: Request ID for each process
+        
+        Yields:
+            (index, result) as each call completes, where result is the
+            verification dictionary or the exception for that process
+        """
+        start_ns = time.perf_counter_ns()
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Starting LLM batch verification with Groq",
+                extra={"extra_data": {
+                    "request_ids": request_ids,
+                    "total": len(processos_data),
                     "llm_framework": "groq"
                 }}
             )
-            raise
+        
+        inputs = [self._build_input(processo_data) for processo_data in processos_data]
+        keys = [self._response_key(chain_input) for chain_input in inputs]
+        
+        # Serve repeated inputs from the response cache, batch the rest
+        pending = []
+        for idx, key in enumerate(keys):
+            cached = self._get_cached_response(
+                key, (time.perf_counter_ns() - start_ns) // 1_000_000
+            )
+            if cached is not None:
+                yield idx, cached
+            else:
+                pending.append(idx)
+        
+        if not pending:
+            return
+        
+        # Explicit tasks so calls still queued or running are cancelled when
+        # the consumer stops early (e.g. after a credits/auth failure)
+        semaphore = asyncio.Semaphore(settings.batch_concurrency)
+        config: RunnableConfig = {"callbacks": langsmith_client.callbacks}
+        
+        async def _call(chain_input: Dict[str, str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._ainvoke_bounded(chain_input, config)
+        
+        tasks = {asyncio.ensure_future(_call(inputs[idx])): idx for idx in pending}
+        try:
+            remaining = set(tasks)
+            while remaining:
+                done, remaining = await asyncio.wait(
+                    remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    idx = tasks[task]
+                    processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
+                    request_id = request_ids[idx]
+                    
+                    error = task.exception()
+                    if error is not None:
+                        yield idx, self._translate_error(error, processing_time, request_id)
+                        continue
+                    
+                    verification = self._build_result(task.result(), processing_time, request_id)
+                    self._cache_response(keys[idx], verification)
+                    yield idx, verification
+        finally:
+            unfinished = [task for task in tasks if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP connection pool."""
+        await self.http_async_client.aclose()
     
     def get_prompt_version(self) -> str:
         """Return current prompt version."""
-        return self._prompt_version
\ No newline at end of file
+        return self._prompt_version
+
+
+@lru_cache(maxsize=1)
+def get_llm_service() -> LLMService:
+    """Factory to get singleton instance of the LLM service."""
+    return LLMService()
@@ -1,7 +1,10 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from app.config import settings
+from app.external.llm_service import get_llm_service
+from app.use_cases.verify_process import get_verify_use_case
 from app.utils.logger import get_logger, setup_logging
 from app.api.routes import health, verify, process, analytics, monitoring
 from app.api.middleware.logging import LoggingMiddleware, ErrorHandlingMiddleware
@@ -11,6 +14,36 @@ from app.api.middleware.logging import LoggingMiddleware, ErrorHandlingMiddlewar
 setup_logging()
 logger = get_logger("main")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up and tear down process-wide resources."""
+    # Routes are static after include_router, build the schema at boot
+    app.openapi_schema = custom_openapi()
+    
+    logger.info(
+        "Application started",
+        extra={"extra_data": {
+            "environment": settings.environment,
+            "debug": settings.debug,
+            "api_version": settings.api_version
+        }}
+    )
+    
+    yield
+    
+    # Only close the LLM client if it was ever created, and drop the closed
+    # instance (and the use case holding it) so a restarted app builds fresh ones
+    if get_llm_service.cache_info().currsize:
+        await get_llm_service().aclose()
+        get_llm_service.cache_clear()
+        get_verify_use_case.cache_clear()
+    
+    # The log listener is stopped by atexit: the app may be started again in
+    # this process (tests, reloads) and must keep logging
+    logger.info("Application shut down")
+
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.api_title,
@@ -18,17 +51,22 @@ app = FastAPI(
     version=settings.api_version,
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
+if settings.enable_profiler:
+    from app.api.middleware.profiler import ProfilerMiddleware
+    app.add_middleware(ProfilerMiddleware)
+
 app.add_middleware(ErrorHandlingMiddleware)
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=settings.cors_allowed_origins,
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization", "x-request-id"],
 )
 
 app.include_router(health.router)
@@ -38,25 +76,6 @@ app.include_router(analytics.router)
 app.include_router(monitoring.router)
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Event executed when the application starts."""
-    logger.info(
-        "Application started",
-        extra={"extra_data": {
-            "environment": settings.environment,
-            "debug": settings.debug,
-            "api_version": settings.api_version
-        }}
-    )
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Event executed when the application shuts down."""
-    logger.info("Application shut down")
-
-
 def custom_openapi():
     """Customize OpenAPI schema."""
     if app.openapi_schema:
@@ -83,10 +102,17 @@ app.openapi = custom_openapi
 if __name__ == "__main__":
     import uvicorn
     
+    reload = settings.reload and settings.environment == "development"
+    
     uvicorn.run(
         "app.main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.reload and settings.environment == "development",
+        loop="uvloop",
+        http="httptools",
+        # Repository and caches are in-process, so more than one worker
+        # only makes sense once storage moves out of memory
+        workers=1 if reload else settings.workers,
+        reload=reload,
         log_level=settings.log_level.lower(),
     )
\ No newline at end of file
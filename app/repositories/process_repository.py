@@ -1,60 +1,204 @@
-from typing import Dict, List, Optional
+import logging
+import time
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 from app.domain.entities import ProcessoVerificacao, DecisaoJurisdica
+from app.domain.policies import Decision
+from app.utils.clock import datetime_to_ns
 from app.utils.logger import get_logger
 
 
 logger = get_logger("repository")
 
+# Seconds an aggregate stays cached when the repository is not written to
+AGGREGATES_TTL_SECONDS = 5.0
+
 
 class ProcessoRepository:
-    """Repository to store process verifications (in memory)."""
+    """
+    Repository to store process verifications (in memory).
+    
+    Only accessed from the event loop thread and no method awaits, so each
+    call sees a consistent view without locks. get_* return list copies;
+    iter_* views must be consumed before the caller awaits again.
+    """
     
     def __init__(self):
         self._processos: Dict[str, ProcessoVerificacao] = {}
         self._indices_metadata: Dict[str, List[str]] = {}
+        self._version = 0
+        self._aggregates: Dict[str, Tuple[int, float, Any]] = {}
+        self._reset_indices()
+        self._reset_time_stats()
+    
+    def _reset_indices(self) -> None:
+        """Reset the secondary indices (dicts used as insertion-ordered sets)."""
+        # Keyed by Decision members (the entity coerces resultado on creation)
+        self._by_decision: Dict[Decision, Dict[str, None]] = defaultdict(dict)
+        self._by_policy: Dict[str, Dict[str, None]] = defaultdict(dict)
+        # Sorted (processado_em_ns, numero) pairs for range queries
+        self._by_date: List[Tuple[int, str]] = []
+    
+    def _index(
+        self,
+        numero: str,
+        anterior: Optional[ProcessoVerificacao],
+        verificacao: ProcessoVerificacao
+    ) -> None:
+        """Move a process number between the date, decision and policy indices."""
+        if anterior is not None:
+            entry = (anterior.processado_em_ns, numero)
+            pos = bisect_left(self._by_date, entry)
+            if pos < len(self._by_date) and self._by_date[pos] == entry:
+                del self._by_date[pos]
+            self._by_decision[anterior.decisao.resultado].pop(numero, None)
+            for policy_id in anterior.decisao.citacoes:
+                numeros = self._by_policy[policy_id]
+                numeros.pop(numero, None)
+                if not numeros:
+                    del self._by_policy[policy_id]
+        
+        insort(self._by_date, (verificacao.processado_em_ns, numero))
+        self._by_decision[verificacao.decisao.resultado][numero] = None
+        for policy_id in verificacao.decisao.citacoes:
+            self._by_policy[policy_id][numero] = None
+    
+    def _reset_time_stats(self) -> None:
+        """Reset running processing time aggregates."""
+        self._tempo_sum = 0
+        self._tempo_count = 0
+        self._tempo_min: Optional[int] = None
+        self._tempo_max: Optional[int] = None
+        self._tempo_bounds_dirty = False
+    
+    def bump_version(self) -> None:
+        """Invalidate cached aggregates after a write."""
+        self._version += 1
+    
+    def _cached(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Return aggregate `name` from cache or compute it with a TTL."""
+        now = time.monotonic()
+        entry = self._aggregates.get(name)
+        if entry is not None and entry[0] == self._version and entry[1] > now:
+            return entry[2]
+        
+        value = compute()
+        self._aggregates[name] = (self._version, now + AGGREGATES_TTL_SECONDS, value)
+        return value
+    
+    def _track_time(self, old: Optional[int], new: Optional[int]) -> None:
+        """Update running processing time aggregates on save."""
+        if old:
+            self._tempo_sum -= old
+            self._tempo_count -= 1
+            if old == self._tempo_min or old == self._tempo_max:
+                self._tempo_bounds_dirty = True
+        
+        if new:
+            self._tempo_sum += new
+            self._tempo_count += 1
+            if not self._tempo_bounds_dirty:
+                if self._tempo_min is None or new < self._tempo_min:
+                    self._tempo_min = new
+                if self._tempo_max is None or new > self._tempo_max:
+                    self._tempo_max = new
+    
+    def _store(self, verificacao: ProcessoVerificacao) -> None:
+        """Store a verification and update indices and running aggregates."""
+        numero = verificacao.numeroProcesso
+        # Re-inserted on update so iter_all follows the same most-recent-last
+        # order as the decision index
+        anterior = self._processos.pop(numero, None)
+        self._processos[numero] = verificacao
+        self._index(numero, anterior, verificacao)
+        self._track_time(
+            anterior.tempo_processamento_ms if anterior else None,
+            verificacao.tempo_processamento_ms
+        )
     
     def save(self, verificacao: ProcessoVerificacao) -> None:
         """Save a process verification."""
         numero = verificacao.numeroProcesso
-        self._processos[numero] = verificacao
+        self._store(verificacao)
+        self.bump_version()
         
-        logger.info(
-            "Verification saved in repository",
-            extra={"extra_data": {"numero_processo": numero}}
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Verification saved in repository",
+                extra={"extra_data": {"numero_processo": numero}}
+            )
+    
+    def save_many(self, verificacoes: Iterable[ProcessoVerificacao]) -> None:
+        """Save several verifications, invalidating aggregates only once."""
+        total = 0
+        for verificacao in verificacoes:
+            self._store(verificacao)
+            total += 1
+        
+        if not total:
+            return
+        
+        self.bump_version()
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Verifications saved in repository",
+                extra={"extra_data": {"total": total}}
+            )
     
     def get_by_numero(self, numero_processo: str) -> Optional[ProcessoVerificacao]:
         """Retrieve a verification by process number."""
         return self._processos.get(numero_processo)
     
+    def iter_all(self) -> Iterator[ProcessoVerificacao]:
+        """Iterate over all verifications without copying them."""
+        return iter(self._processos.values())
+    
     def get_all(self) -> List[ProcessoVerificacao]:
         """Return all verifications."""
-        return list(self._processos.values())
+        return list(self.iter_all())
     
-    def get_by_decision(self, decision: str) -> List[ProcessoVerificacao]:
+    def iter_by_decision(self, decision: Decision) -> Iterator[ProcessoVerificacao]:
+        """Iterate over verifications with the given decision type."""
+        processos = self._processos
+        return (processos[n] for n in self._by_decision.get(decision, ()))
+    
+    def get_by_decision(self, decision: Decision) -> List[ProcessoVerificacao]:
         """Retrieve verifications by decision type."""
-        return [
-            v for v in self._processos.values()
-            if v.decisao.resultado == decision
-        ]
+        return list(self.iter_by_decision(decision))
+    
+    def count_by_decision(self, decision: Decision) -> int:
+        """Return the number of verifications with the given decision type."""
+        return len(self._by_decision.get(decision, ()))
+    
+    def iter_by_date_range(
+        self,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Iterator[ProcessoVerificacao]:
+        """Iterate over verifications in a date range, oldest first."""
+        lo = bisect_left(self._by_date, (datetime_to_ns(start_date),))
+        hi = bisect_left(self._by_date, (datetime_to_ns(end_date) + 1,))
+        processos = self._processos
+        return (processos[n] for _, n in islice(self._by_date, lo, hi))
     
     def get_by_date_range(
         self,
         start_date: datetime,
         end_date: datetime
     ) -> List[ProcessoVerificacao]:
-        """Retrieve verifications by date range."""
-        return [
-            v for v in self._processos.values()
-            if start_date <= v.processado_em <= end_date
-        ]
+        """Retrieve verifications by date range, oldest first."""
+        return list(self.iter_by_date_range(start_date, end_date))
     
     def get_statistics(self) -> Dict:
-        """Return general statistics."""
-        verificacoes = list(self._processos.values())
+        """Return general statistics from the counters maintained on save."""
+        total = len(self._processos)
         
-        if not verificacoes:
+        if not total:
             return {
                 "total": 0,
                 "approved": 0,
@@ -64,15 +208,12 @@ class ProcessoRepository:
                 "tempo_medio_ms": 0.0
             }
         
-        total = len(verificacoes)
-        approved = sum(1 for v in verificacoes if v.decisao.resultado == "approved")
-        rejected = sum(1 for v in verificacoes if v.decisao.resultado == "rejected")
-        incomplete = sum(1 for v in verificacoes if v.decisao.resultado == "incomplete")
+        approved = self.count_by_decision(Decision.APPROVED)
+        rejected = self.count_by_decision(Decision.REJECTED)
+        incomplete = self.count_by_decision(Decision.INCOMPLETE)
         
-        tempo_medio = (
-            sum(v.tempo_processamento_ms or 0 for v in verificacoes) / total
-            if total > 0 else 0
-        )
+        # Verifications without a processing time contribute zero
+        tempo_medio = self._tempo_sum / total
         
         return {
             "total": total,
@@ -84,18 +225,36 @@ class ProcessoRepository:
         }
     
     def get_policy_usage(self) -> Dict[str, int]:
-        """Return policy usage count."""
-        policy_count: Dict[str, int] = {}
+        """Return policy usage count (cached until the next write or TTL)."""
+        return self._cached("policy_usage", self._compute_policy_usage)
+    
+    def _compute_policy_usage(self) -> Dict[str, int]:
+        """Compute policy usage count from the policy index."""
+        policy_count = Counter({
+            policy_id: len(numeros)
+            for policy_id, numeros in self._by_policy.items()
+        })
         
-        for v in self._processos.values():
-            for policy_id in v.decisao.citacoes:
-                policy_count[policy_id] = policy_count.get(policy_id, 0) + 1
+        return dict(policy_count.most_common())
+    
+    def get_processing_time_stats(self) -> Dict[str, float]:
+        """Return processing time aggregates maintained on save."""
+        if self._tempo_bounds_dirty:
+            tempos = [
+                v.tempo_processamento_ms for v in self._processos.values()
+                if v.tempo_processamento_ms
+            ]
+            self._tempo_min = min(tempos) if tempos else None
+            self._tempo_max = max(tempos) if tempos else None
+            self._tempo_bounds_dirty = False
         
-        return dict(sorted(
-            policy_count.items(),
-            key=lambda x: x[1],
-            reverse=True
-        ))
+        count = self._tempo_count
+        return {
+            "media_ms": self._tempo_sum / count if count else 0,
+            "minimo_ms": self._tempo_min or 0,
+            "maximo_ms": self._tempo_max or 0,
+            "total_processamentos": count
+        }
     
     def count(self) -> int:
         """Return total number of stored verifications."""
@@ -104,16 +263,13 @@ class ProcessoRepository:
     def clear(self) -> None:
         """Clear repository (only for tests)."""
         self._processos.clear()
+        self._reset_indices()
+        self._reset_time_stats()
+        self.bump_version()
         logger.info("Repository cleared")
 
 
-# Singleton instance
-_repository_instance: Optional[ProcessoRepository] = None
-
-
+@lru_cache(maxsize=1)
 def get_repository() -> ProcessoRepository:
     """Factory to get singleton instance of the repository."""
-    global _repository_instance
-    if _repository_instance is None:
-        _repository_instance = ProcessoRepository()
-    return _repository_instance
\ No newline at end of file
+    return ProcessoRepository()
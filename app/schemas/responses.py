@@ -1,9 +1,47 @@
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
 from app.domain.policies import Decision
 
 
+# OpenAPI examples are built only when the schema is generated, so they
+# are not held on the model classes for the lifetime of each worker
+def _processo_example(schema: Dict[str, Any]) -> None:
+    """Add the ProcessoInputSchema example to its JSON schema."""
+    schema["example"] = {
+        "numeroProcesso": "0004587-00.2021.4.05.8100",
+        "classe": "Cumprimento de Sentença contra a Fazenda Pública",
+        "orgaoJulgador": "19ª VARA FEDERAL - SOBRAL/CE",
+        "ultimaDistribuicao": "2024-11-18T23:15:44.130Z",
+        "assunto": "Rural (Art. 48/51)",
+        "segredoJustica": False,
+        "justicaGratuita": True,
+        "siglaTribunal": "TRF5",
+        "esfera": "Federal",
+        "valorCausa": 67592,
+        "valorCondenacao": 67592,
+        "honorarios": {
+            "contratuais": 6000,
+            "periciais": 1200,
+            "sucumbenciais": 3000
+        }
+    }
+
+
+def _verificacao_example(schema: Dict[str, Any]) -> None:
+    """Add the VerificacaoResponseSchema example to its JSON schema."""
+    schema["example"] = {
+        "numeroProcesso": "0004587-00.2021.4.05.8100",
+        "decision": "approved",
+        "rationale": "Processo cumpre todos os requisitos: trânsito em julgado comprovado, fase de execução iniciada, valor de condenação acima do mínimo.",
+        "citations": ["POL-1", "POL-2"],
+        "confidence": 0.95,
+        "processedAt": "2024-11-25T10:30:00Z",
+        "processingTimeMs": 2345,
+        "policyVersion": "1.0"
+    }
+
+
 class DocumentoSchema(BaseModel):
     """Document schema."""
     id: str
@@ -39,28 +77,7 @@ class ProcessoInputSchema(BaseModel):
     movimentos: List[MovimentoSchema] = Field(default_factory=list)
     honorarios: Optional[Dict[str, Optional[float]]] = None
     
-    model_config = ConfigDict(
-        json_schema_extra={
-            "example": {
-                "numeroProcesso": "0004587-00.2021.4.05.8100",
-                "classe": "Cumprimento de Sentença contra a Fazenda Pública",
-                "orgaoJulgador": "19ª VARA FEDERAL - SOBRAL/CE",
-                "ultimaDistribuicao": "2024-11-18T23:15:44.130Z",
-                "assunto": "Rural (Art. 48/51)",
-                "segredoJustica": False,
-                "justicaGratuita": True,
-                "siglaTribunal": "TRF5",
-                "esfera": "Federal",
-                "valorCausa": 67592,
-                "valorCondenacao": 67592,
-                "honorarios": {
-                    "contratuais": 6000,
-                    "periciais": 1200,
-                    "sucumbenciais": 3000
-                }
-            }
-        }
-    )
+    model_config = ConfigDict(json_schema_extra=_processo_example)
 
 
 class DecisaoSchema(BaseModel):
@@ -84,20 +101,17 @@ class VerificacaoResponseSchema(BaseModel):
     processingTimeMs: int
     policyVersion: str = "1.0"
     
-    model_config = ConfigDict(
-        json_schema_extra={
-            "example": {
-                "numeroProcesso": "0004587-00.2021.4.05.8100",
-                "decision": "approved",
-                "rationale": "Processo cumpre todos os requisitos: trânsito em julgado comprovado, fase de execução iniciada, valor de condenação acima do mínimo.",
-                "citations": ["POL-1", "POL-2"],
-                "confidence": 0.95,
-                "processedAt": "2024-11-25T10:30:00Z",
-                "processingTimeMs": 2345,
-                "policyVersion": "1.0"
-            }
-        }
-    )
+    # Instances are cached and shared across requests, so keep them read-only
+    model_config = ConfigDict(frozen=True, json_schema_extra=_verificacao_example)
+    
+    # Serialized body, kept because cached instances are returned repeatedly
+    _json: Optional[bytes] = PrivateAttr(default=None)
+    
+    def json_bytes(self) -> bytes:
+        """Return the JSON body, serializing it only on first use."""
+        if self._json is None:
+            self._json = self.__pydantic_serializer__.to_json(self)
+        return self._json
 
 
 class ProcessoHistoricoSchema(BaseModel):
@@ -128,6 +142,7 @@ class BatchVerificacaoResponseSchema(BaseModel):
     erros: int
     resultados: List[VerificacaoResponseSchema]
     tempo_total_ms: int
+    api_error: Optional[str] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
@@ -1,12 +1,16 @@
-import uuid
+import logging
 import time
-from typing import Dict, Any
+from contextlib import aclosing
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
-from app.external.llm_service import LLMService
+from app.external.llm_service import LLMService, get_llm_service
 from app.external.langsmith_client import langsmith_client
 from app.repositories.process_repository import get_repository
 from app.schemas.responses import VerificacaoResponseSchema
 from app.domain.entities import ProcessoVerificacao, DecisaoJurisdica
+from app.utils.cache import verification_cache
+from app.utils.ids import new_id
 from app.utils.logger import get_logger
 
 
@@ -19,6 +23,81 @@ class VerifyProcessUseCase:
     def __init__(self, llm_service: LLMService = None):
         self.llm_service = llm_service or LLMService()
         self.repository = get_repository()
+        # Prompt version is fixed for the lifetime of the LLM service
+        self._prompt_version = self.llm_service.get_prompt_version()
+    
+    def refresh_prompt_version(self) -> None:
+        """Re-read the prompt version after the LLM service prompt changes."""
+        self._prompt_version = self.llm_service.get_prompt_version()
+    
+    def _record(
+        self,
+        processo_data: Dict[str, Any],
+        llm_result: Dict[str, Any],
+        request_id: str,
+        processing_time_ms: int,
+        pending: Optional[List[ProcessoVerificacao]] = None
+    ) -> VerificacaoResponseSchema:
+        """
+        Persist an LLM result and build the verification response.
+        
+        When `pending` is given the entity is appended to it instead of
+        being saved, so the caller can persist a whole batch at once.
+        """
+        numero_processo = processo_data.get("numeroProcesso")
+        
+        # Create verification entity
+        verificacao = ProcessoVerificacao(
+            numeroProcesso=numero_processo,
+            decisao=DecisaoJurisdica(
+                resultado=llm_result["decision"],
+                justificativa=llm_result["rationale"],
+                citacoes=llm_result["citations"],
+                confianca=llm_result.get("confidence"),
+                metadata={
+                    "policy_analysis": llm_result.get("policy_analysis", {}),
+                    "request_id": request_id
+                }
+            ),
+            tempo_processamento_ms=processing_time_ms,
+            versao_llm=self._prompt_version
+        )
+        
+        if pending is None:
+            self.repository.save(verificacao)
+        else:
+            pending.append(verificacao)
+        
+        langsmith_client.log_verification(
+            numero_processo=numero_processo,
+            input_data=processo_data,
+            output_data=llm_result,
+            model_used=llm_result.get("model_used", "unknown"),
+            processing_time_ms=processing_time_ms
+        )
+        
+        response = VerificacaoResponseSchema(
+            numeroProcesso=numero_processo,
+            decision=llm_result["decision"],
+            rationale=llm_result["rationale"],
+            citations=llm_result["citations"],
+            confidence=llm_result.get("confidence"),
+            processingTimeMs=processing_time_ms,
+            processedAt=datetime.utcnow()
+        )
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Verification completed successfully",
+                extra={"extra_data": {
+                    "request_id": request_id,
+                    "numero_processo": numero_processo,
+                    "decision": response.decision,
+                    "processing_time_ms": processing_time_ms
+                }}
+            )
+        
+        return response
     
     async def execute(
         self,
@@ -36,18 +115,34 @@ class VerifyProcessUseCase:
             Response with decision
         """
         if not request_id:
-            request_id = str(uuid.uuid4())
+            request_id = new_id()
         
         numero_processo = processo_data.get("numeroProcesso")
-        start_time = time.time()
-        
-        logger.info(
-            "Starting use case: process verification",
-            extra={"extra_data": {
-                "request_id": request_id,
-                "numero_processo": numero_processo
-            }}
-        )
+        
+        # Check cache first to avoid unnecessary API calls
+        cached = verification_cache.get(processo_data)
+        if cached is not None:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Returning cached verification result",
+                    extra={"extra_data": {
+                        "request_id": request_id,
+                        "numero_processo": numero_processo,
+                        "cache_hit": True
+                    }}
+                )
+            return cached
+        
+        start_ns = time.perf_counter_ns()
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Starting use case: process verification",
+                extra={"extra_data": {
+                    "request_id": request_id,
+                    "numero_processo": numero_processo
+                }}
+            )
         
         try:
             # Call LLM service
@@ -56,59 +151,82 @@ class VerifyProcessUseCase:
                 request_id=request_id
             )
             
-            processing_time_ms = int((time.time() - start_time) * 1000)
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
             
-            # Create verification entity
-            verificacao = ProcessoVerificacao(
-                numeroProcesso=numero_processo,
-                decisao=DecisaoJurisdica(
-                    resultado=llm_result["decision"],
-                    justificativa=llm_result["rationale"],
-                    citacoes=llm_result["citations"],
-                    confianca=llm_result.get("confidence"),
-                    metadata={
-                        "policy_analysis": llm_result.get("policy_analysis", {}),
-                        "request_id": request_id
-                    }
-                ),
-                tempo_processamento_ms=processing_time_ms,
-                versao_llm=self.llm_service.get_prompt_version()
-            )
+            response = self._record(processo_data, llm_result, request_id, processing_time_ms)
             
-            self.repository.save(verificacao)
+            # Cache the result for future requests
+            verification_cache.set(processo_data, response)
             
-            langsmith_client.log_verification(
-                numero_processo=numero_processo,
-                input_data=processo_data,
-                output_data=llm_result,
-                model_used=llm_result.get("model_used", "unknown"),
-                processing_time_ms=processing_time_ms
-            )
-            
-            response = VerificacaoResponseSchema(
-                numeroProcesso=numero_processo,
-                decision=llm_result["decision"],
-                rationale=llm_result["rationale"],
-                citations=llm_result["citations"],
-                confidence=llm_result.get("confidence"),
-                processingTimeMs=processing_time_ms,
-                processedAt=datetime.utcnow()
-            )
+            return response
+        
+        except Exception as e:
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
             
-            logger.info(
-                "Verification completed successfully",
+            logger.error(
+                "Error during process verification",
                 extra={"extra_data": {
                     "request_id": request_id,
                     "numero_processo": numero_processo,
-                    "decision": response.decision,
+                    "error": str(e),
                     "processing_time_ms": processing_time_ms
                 }}
             )
             
-            return response
+            raise
+    
+    async def execute_stream(
+        self,
+        processo_data: Dict[str, Any],
+        request_id: str = None
+    ) -> AsyncIterator[Tuple[bool, Any]]:
+        """
+        Execute a process verification streaming the LLM reply.
+        
+        Args:
+            processo_data: Process data
+            request_id: Unique request ID
+        
+        Yields:
+            (done, data) pairs, where data is the partial LLM output while
+            done is False and the verification response on the last pair
+        """
+        if not request_id:
+            request_id = new_id()
+        
+        numero_processo = processo_data.get("numeroProcesso")
+        
+        cached = verification_cache.get(processo_data)
+        if cached is not None:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Returning cached verification result",
+                    extra={"extra_data": {
+                        "request_id": request_id,
+                        "numero_processo": numero_processo,
+                        "cache_hit": True
+                    }}
+                )
+            yield True, cached
+            return
+        
+        start_ns = time.perf_counter_ns()
+        
+        try:
+            async for done, data in self.llm_service.stream_process(
+                processo_data,
+                request_id=request_id
+            ):
+                if not done:
+                    yield False, data
+                    continue
+                
+                processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+                response = self._record(processo_data, data, request_id, processing_time_ms)
+                verification_cache.set(processo_data, response)
         
         except Exception as e:
-            processing_time_ms = int((time.time() - start_time) * 1000)
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
             
             logger.error(
                 "Error during process verification",
@@ -120,4 +238,68 @@ class VerifyProcessUseCase:
                 }}
             )
             
-            raise
\ No newline at end of file
+            raise
+        
+        yield True, response
+    
+    async def execute_many(
+        self,
+        processos_data: List[Dict[str, Any]],
+        request_ids: List[str]
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Execute several process verifications through one LLM batch.
+        
+        Args:
+            processos_data: List of process data
+            request_ids: Request ID for each process
+        
+        Yields:
+            (index, outcome) as each verification completes, where outcome
+            is the response or the exception raised for that process
+        """
+        start_ns = time.perf_counter_ns()
+        # Saved in one pass when the batch finishes or is abandoned
+        pending: List[ProcessoVerificacao] = []
+        
+        try:
+            # aclosing so an early stop cancels the batch's queued LLM calls
+            async with aclosing(self.llm_service.verify_processes(
+                processos_data,
+                request_ids
+            )) as outcomes:
+                async for idx, llm_result in outcomes:
+                    processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+                    
+                    if isinstance(llm_result, Exception):
+                        logger.error(
+                            "Error during process verification",
+                            extra={"extra_data": {
+                                "request_id": request_ids[idx],
+                                "numero_processo": processos_data[idx].get("numeroProcesso"),
+                                "error": str(llm_result),
+                                "processing_time_ms": processing_time_ms
+                            }}
+                        )
+                        yield idx, llm_result
+                        continue
+                    
+                    try:
+                        outcome = self._record(
+                            processos_data[idx],
+                            llm_result,
+                            request_ids[idx],
+                            processing_time_ms,
+                            pending
+                        )
+                    except Exception as e:
+                        outcome = e
+                    yield idx, outcome
+        finally:
+            self.repository.save_many(pending)
+
+
+@lru_cache(maxsize=1)
+def get_verify_use_case() -> VerifyProcessUseCase:
+    """Factory to get singleton instance of the verification use case."""
+    return VerifyProcessUseCase(get_llm_service())
@@ -2,49 +2,50 @@
 Simple in-memory cache for verification results.
 Prevents duplicate API calls for the same process.
 """
-import hashlib
-import json
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
 from app.utils.logger import get_logger
 
 
 logger = get_logger("cache")
 
+# (numeroProcesso, esfera, valorCondenacao)
+CacheKey = Tuple[str, Optional[str], Optional[float]]
+
 
 class VerificationCache:
-    """In-memory cache for verification results."""
+    """In-memory LRU cache with TTL for verification results."""
     
-    def __init__(self, ttl_minutes: int = 60):
+    def __init__(self, ttl_minutes: int = 60, max_entries: int = 10_000):
         """
         Initialize cache.
         
         Args:
             ttl_minutes: Time to live for cached entries (minutes)
+            max_entries: Maximum entries kept; least recently used go first
         """
         self.ttl_minutes = ttl_minutes
-        self.cache: Dict[str, Dict[str, Any]] = {}
+        self.max_entries = max_entries
+        self._ttl_seconds = ttl_minutes * 60
+        self.cache: "OrderedDict[CacheKey, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
     
-    def _generate_key(self, processo_data: Dict[str, Any]) -> str:
+    def make_key(self, processo_data: Dict[str, Any]) -> CacheKey:
         """
         Generate a cache key from process data.
-        Uses hash of processo number and main fields.
+        The identifying fields are primitives, so the tuple itself is the key.
         """
-        # Use numeric process as primary identifier
-        numero_processo = str(processo_data.get("numeroProcesso", ""))
-        
-        # Create a simple key to avoid re-processing same process
-        key_data = {
-            "numeroProcesso": numero_processo,
+        return (
+            # Use numeric process as primary identifier
+            str(processo_data.get("numeroProcesso", "")),
             # Include main fields that affect decision
-            "esfera": processo_data.get("esfera"),
-            "valorCondenacao": processo_data.get("valorCondenacao")
-        }
-        
-        key_str = json.dumps(key_data, sort_keys=True, default=str)
-        key_hash = hashlib.md5(key_str.encode()).hexdigest()
-        
-        return f"verify_{key_hash}"
+            processo_data.get("esfera"),
+            processo_data.get("valorCondenacao")
+        )
     
     def get(self, processo_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -56,32 +57,37 @@ class VerificationCache:
         Returns:
             Cached result or None if not found/expired
         """
-        key = self._generate_key(processo_data)
+        key = self.make_key(processo_data)
         
-        if key not in self.cache:
+        entry = self.cache.get(key)
+        if entry is None:
+            self.misses += 1
             return None
         
-        entry = self.cache[key]
-        
-        # Check expiration
-        created_at = entry.get("created_at")
-        if created_at:
-            age = datetime.now() - created_at
-            if age > timedelta(minutes=self.ttl_minutes):
+        # Check expiration against the monotonic deadline set on write
+        now = time.monotonic()
+        if now > entry["expires_at"]:
+            if logger.isEnabledFor(logging.INFO):
+                age = now - entry["expires_at"] + self._ttl_seconds
                 logger.info(
                     "Cache entry expired",
-                    extra={"extra_data": {"key": key, "age_minutes": age.total_seconds() / 60}}
+                    extra={"extra_data": {"key": key, "age_minutes": age / 60}}
                 )
-                del self.cache[key]
-                return None
+            del self.cache[key]
+            self.misses += 1
+            return None
         
-        logger.info(
-            "Cache hit for verification",
-            extra={"extra_data": {
-                "key": key,
-                "numero_processo": processo_data.get("numeroProcesso")
-            }}
-        )
+        self.hits += 1
+        self.cache.move_to_end(key)
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Cache hit for verification",
+                extra={"extra_data": {
+                    "key": key,
+                    "numero_processo": processo_data.get("numeroProcesso")
+                }}
+            )
         
         return entry.get("result")
     
@@ -93,42 +99,77 @@ class VerificationCache:
             processo_data: Process data
             result: Verification result
         """
-        key = self._generate_key(processo_data)
+        key = self.make_key(processo_data)
         
         self.cache[key] = {
             "result": result,
-            "created_at": datetime.now(),
+            # Wall clock only feeds get_stats, formatted there
+            "created_at": time.time(),
+            "expires_at": time.monotonic() + self._ttl_seconds,
             "numero_processo": processo_data.get("numeroProcesso")
         }
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
         
-        logger.info(
-            "Cached verification result",
-            extra={"extra_data": {
-                "key": key,
-                "numero_processo": processo_data.get("numeroProcesso")
-            }}
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Cached verification result",
+                extra={"extra_data": {
+                    "key": key,
+                    "numero_processo": processo_data.get("numeroProcesso")
+                }}
+            )
+    
+    def get_many(self, processos_data: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get cached verification results for several processes at once.
+        
+        Args:
+            processos_data: List of process data
+        
+        Returns:
+            List aligned with the input, with None for misses
+        """
+        return [self.get(processo_data) for processo_data in processos_data]
+    
+    def set_many(self, items: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+        """
+        Cache several verification results at once.
+        
+        Args:
+            items: List of (process data, verification result) pairs
+        """
+        for processo_data, result in items:
+            self.set(processo_data, result)
     
     def clear(self) -> None:
-        """Clear all cache entries."""
+        """Clear all cache entries and reset the hit/miss counters."""
         self.cache.clear()
+        self.hits = 0
+        self.misses = 0
         logger.info("Cache cleared")
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
+        lookups = self.hits + self.misses
         return {
             "total_entries": len(self.cache),
+            "max_entries": self.max_entries,
             "ttl_minutes": self.ttl_minutes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
             "entries": [
                 {
                     "numero_processo": entry.get("numero_processo"),
-                    "cached_at": entry.get("created_at").isoformat() if entry.get("created_at") else None
+                    "cached_at": datetime.fromtimestamp(entry["created_at"]).isoformat()
                 }
                 for entry in self.cache.values()
             ]
         }
 
 
-# Global cache instance (1 hour TTL)
+# Global cache instance (1 hour TTL, at most 10k entries)
 verification_cache = VerificationCache(ttl_minutes=60)
 
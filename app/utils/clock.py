@@ -0,0 +1,44 @@
+"""
+Second-resolution wall clock for timestamps on hot paths.
+Avoids building a new datetime and ISO string on every request.
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Tuple
+
+
+# (epoch second, datetime, ISO string) of the last refresh
+_cached: Tuple[int, datetime, str] = (-1, datetime.min, "")
+
+
+def _refresh() -> Tuple[int, datetime, str]:
+    """Return the cached entry, rebuilding it when the second changes."""
+    global _cached
+    second = int(time.time())
+    if second != _cached[0]:
+        now = datetime.utcfromtimestamp(second)
+        _cached = (second, now, now.isoformat())
+    return _cached
+
+
+def utc_now() -> datetime:
+    """Current UTC time truncated to the second."""
+    return _refresh()[1]
+
+
+def utc_now_iso() -> str:
+    """Current UTC time truncated to the second, as an ISO 8601 string."""
+    return _refresh()[2]
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def ns_to_datetime(timestamp_ns: int) -> datetime:
+    """Convert epoch nanoseconds to a naive UTC datetime."""
+    return _EPOCH + timedelta(microseconds=timestamp_ns // 1000)
+
+
+def datetime_to_ns(value: datetime) -> int:
+    """Convert a naive UTC datetime to epoch nanoseconds."""
+    return (value - _EPOCH) // timedelta(microseconds=1) * 1000
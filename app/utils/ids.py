@@ -0,0 +1,15 @@
+"""
+Identifier generation for requests and batches.
+"""
+import os
+import time
+
+
+def new_id() -> str:
+    """
+    Generate a 32-char hex identifier.
+    
+    Time-ordered prefix (nanoseconds) followed by 8 random bytes, so IDs
+    sort by creation time in logs like a UUIDv7.
+    """
+    return f"{time.time_ns():016x}{os.urandom(8).hex()}"
@@ -1,17 +1,34 @@
+import atexit
 import logging
-import json
+import logging.handlers
+import queue
 import sys
-from datetime import datetime
-from typing import Any
+import time
+from typing import Any, Optional, Tuple
+import orjson
 from app.config import settings
 
 
+# Last formatted second, reused by records created within that second
+_ts_cache: Tuple[int, str] = (-1, "")
+
+
+def _fmt_ts(created: float) -> str:
+    """Format an epoch timestamp as naive UTC ISO-8601 with microseconds."""
+    global _ts_cache
+    
+    second = int(created)
+    if _ts_cache[0] != second:
+        _ts_cache = (second, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second)))
+    return f"{_ts_cache[1]}.{int((created - second) * 1e6):06d}"
+
+
 class JSONFormatter(logging.Formatter):
     """Format logs as JSON for better parseability."""
     
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _fmt_ts(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -29,16 +46,39 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, "extra_data"):
             log_data.update(record.extra_data)
         
-        return json.dumps(log_data, ensure_ascii=False)
+        return orjson.dumps(
+            log_data, default=str, option=orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    """Queue records untouched so the formatter still sees exc_info and extras."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() formats on the caller thread, folds the
+        # traceback into msg and clears exc_info; the queue never leaves
+        # this process, so the original record can be passed as is
+        return record
+
+
+# Background listener that formats and writes queued records
+_listener: Optional[logging.handlers.QueueListener] = None
 
 
 def setup_logging() -> logging.Logger:
-    """Configure structured logging for the application."""
+    """
+    Configure structured logging for the application.
+    
+    Records are pushed to an in-memory queue by the request path and
+    formatted/written to stdout by a background listener thread.
+    """
+    global _listener
     
     logger = logging.getLogger("juscash")
     logger.setLevel(getattr(logging, settings.log_level))
     
     logger.handlers.clear()
+    shutdown_logging()
     
     handler = logging.StreamHandler(sys.stdout)
     handler.setLevel(getattr(logging, settings.log_level))
@@ -51,15 +91,34 @@ def setup_logging() -> logging.Logger:
         )
     
     handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(_RecordQueueHandler(log_queue))
+    
+    _listener = logging.handlers.QueueListener(
+        log_queue, handler, respect_handler_level=True
+    )
+    _listener.start()
     
     return logger
 
 
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background listener."""
+    global _listener
+    
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 # Logger global
 logger = setup_logging()
 
+# Flush queued records for processes that exit without the app shutdown hook
+atexit.register(shutdown_logging)
+
 
 def get_logger(name: str) -> logging.Logger:
     """Get logger with specific name."""
-    return logging.getLogger(f"juscash.{name}")
\ No newline at end of file
+    return logging.getLogger(f"juscash.{name}")
@@ -1,13 +1,18 @@
 """
 Script para testar as otimizações de cache e tratamento de erros.
 """
-import requests
+import asyncio
+import httpx
 import json
 import time
 from typing import Dict, Any
 
 BASE_URL = "http://localhost:8000"
 
+# Cliente único com keep-alive: evita um handshake TCP por requisição
+# e deixa a medição de cache hit livre do custo de conexão
+LIMITS = httpx.Limits(max_connections=4, max_keepalive_connections=4)
+
 # Processo de teste
 TEST_PROCESSO = {
     "numeroProcesso": "0001234-56.2023.1.99.9999",
@@ -26,11 +31,12 @@ def print_section(title: str):
     print(f"{'='*60}\n")
 
 
-def test_api_status():
+async def test_api_status(client: httpx.AsyncClient):
     """Test API status endpoint."""
-    print_section("1️⃣  Testando Status da API")
+    response = await client.get("/monitoring/api-status")
     
-    response = requests.get(f"{BASE_URL}/monitoring/api-status")
+    # Imprime só após a resposta para não intercalar com testes concorrentes
+    print_section("1️⃣  Testando Status da API")
     
     if response.status_code == 200:
         data = response.json()
@@ -48,11 +54,12 @@ def test_api_status():
         print(response.text)
 
 
-def test_cache_stats():
+async def test_cache_stats(client: httpx.AsyncClient):
     """Test cache statistics endpoint."""
-    print_section("2️⃣  Estatísticas de Cache (Inicial)")
+    response = await client.get("/monitoring/cache-stats")
     
-    response = requests.get(f"{BASE_URL}/monitoring/cache-stats")
+    # Imprime só após a resposta para não intercalar com testes concorrentes
+    print_section("2️⃣  Estatísticas de Cache (Inicial)")
     
     if response.status_code == 200:
         data = response.json()
@@ -70,7 +77,7 @@ def test_cache_stats():
         print(f"❌ Erro: {response.status_code}")
 
 
-def test_verify_first_call():
+async def test_verify_first_call(client: httpx.AsyncClient):
     """Test first verification (should call API)."""
     print_section("3️⃣  Primeira Chamada (API - não há cache)")
     
@@ -78,8 +85,8 @@ def test_verify_first_call():
     print(f"   Processo: {TEST_PROCESSO['numeroProcesso']}")
     
     start = time.time()
-    response = requests.post(
-        f"{BASE_URL}/verify/",
+    response = await client.post(
+        "/verify/",
         json=TEST_PROCESSO,
         timeout=30
     )
@@ -113,15 +120,15 @@ def test_verify_first_call():
     return True
 
 
-def test_verify_cache_hit():
+async def test_verify_cache_hit(client: httpx.AsyncClient):
     """Test second verification (should hit cache)."""
     print_section("4️⃣  Segunda Chamada (Cache - mesmo processo)")
     
     print("📤 Enviando mesma requisição novamente...")
     
     start = time.time()
-    response = requests.post(
-        f"{BASE_URL}/verify/",
+    response = await client.post(
+        "/verify/",
         json=TEST_PROCESSO,
         timeout=30
     )
@@ -141,11 +148,11 @@ def test_verify_cache_hit():
         print(response.text)
 
 
-def test_cache_stats_after():
+async def test_cache_stats_after(client: httpx.AsyncClient):
     """Test cache statistics after verifications."""
     print_section("5️⃣  Estatísticas de Cache (Após verificações)")
     
-    response = requests.get(f"{BASE_URL}/monitoring/cache-stats")
+    response = await client.get("/monitoring/cache-stats")
     
     if response.status_code == 200:
         data = response.json()
@@ -162,18 +169,18 @@ def test_cache_stats_after():
         print(f"❌ Erro: {response.status_code}")
 
 
-def test_clear_cache():
+async def test_clear_cache(client: httpx.AsyncClient):
     """Test clearing cache."""
     print_section("6️⃣  Limpando Cache")
     
-    response = requests.post(f"{BASE_URL}/monitoring/cache/clear")
+    response = await client.post("/monitoring/cache/clear")
     
     if response.status_code == 200:
         data = response.json()
         print(f"✅ {data.get('message')}")
         
         # Verify cache was cleared
-        response = requests.get(f"{BASE_URL}/monitoring/cache-stats")
+        response = await client.get("/monitoring/cache-stats")
         if response.status_code == 200:
             cache = response.json().get('cache', {})
             print(f"   Total de entries agora: {cache.get('total_entries', 0)}")
@@ -181,11 +188,12 @@ def test_clear_cache():
         print(f"❌ Erro: {response.status_code}")
 
 
-def test_health():
+async def test_health(client: httpx.AsyncClient):
     """Test health endpoint."""
-    print_section("❤️  Health Check")
+    response = await client.get("/monitoring/health")
     
-    response = requests.get(f"{BASE_URL}/monitoring/health")
+    # Imprime só após a resposta para não intercalar com testes concorrentes
+    print_section("❤️  Health Check")
     
     if response.status_code == 200:
         data = response.json()
@@ -196,7 +204,7 @@ def test_health():
         print(f"❌ Erro: {response.status_code}")
 
 
-def main():
+async def main():
     """Run all tests."""
     print("\n" + "="*60)
     print("  🧪 Script de Teste de Otimizações")
@@ -204,30 +212,34 @@ def main():
     print("\n⚠️  Certifique-se que a API está rodando em http://localhost:8000")
     print("   Execute: python -m uvicorn app.main:app --reload")
     
-    try:
-        # Check if API is running
-        response = requests.get(f"{BASE_URL}/monitoring/health", timeout=5)
-        if response.status_code != 200:
-            print("\n❌ API não respondeu. Inicie a API primeiro!")
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=LIMITS) as client:
+        try:
+            # Check if API is running
+            response = await client.get("/monitoring/health", timeout=5)
+            if response.status_code != 200:
+                print("\n❌ API não respondeu. Inicie a API primeiro!")
+                return
+        except httpx.TransportError:
+            print("\n❌ Não conseguiu conectar à API em http://localhost:8000")
+            print("   Inicie a aplicação com: python -m uvicorn app.main:app --reload")
             return
-    except requests.exceptions.ConnectionError:
-        print("\n❌ Não conseguiu conectar à API em http://localhost:8000")
-        print("   Inicie a aplicação com: python -m uvicorn app.main:app --reload")
-        return
-    
-    # Run tests
-    test_health()
-    test_api_status()
-    test_cache_stats()
-    
-    if not test_verify_first_call():
-        print("\n❌ Falha na primeira chamada. Verifique sua chave de API.")
-        return
-    
-    test_cache_stats()
-    test_verify_cache_hit()
-    test_cache_stats_after()
-    test_clear_cache()
+        
+        # Independent probes run concurrently
+        await asyncio.gather(
+            test_health(client),
+            test_api_status(client),
+            test_cache_stats(client)
+        )
+        
+        # The remaining steps depend on each other's cache state
+        if not await test_verify_first_call(client):
+            print("\n❌ Falha na primeira chamada. Verifique sua chave de API.")
+            return
+        
+        await test_cache_stats(client)
+        await test_verify_cache_hit(client)
+        await test_cache_stats_after(client)
+        await test_clear_cache(client)
     
     print_section("✅ Testes Concluídos!")
     print("📊 Resumo:\n")
@@ -242,5 +254,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
 
@@ -0,0 +1,49 @@
+"""
+A batch consumer that stops early must not leave LLM calls running
+"""
+import asyncio
+from contextlib import aclosing
+
+from app.config import settings
+from app.external import llm_service as llm_module
+from app.external.llm_service import APICreditsExhaustedError, LLMService
+from app.use_cases.verify_process import VerifyProcessUseCase
+
+
+def test_closing_batch_cancels_queued_llm_calls(monkeypatch):
+    monkeypatch.setattr(
+        llm_module,
+        "settings",
+        settings.model_copy(update={"batch_concurrency": 2, "groq_api_key": "test"})
+    )
+    service = LLMService()
+    calls = []
+    
+    async def fake_ainvoke_bounded(chain_input, config):
+        calls.append(chain_input)
+        if len(calls) == 1:
+            raise APICreditsExhaustedError("credits exhausted")
+        await asyncio.sleep(1)
+        return {"decision": "approved"}
+    
+    monkeypatch.setattr(service, "_ainvoke_bounded", fake_ainvoke_bounded)
+    use_case = VerifyProcessUseCase(service)
+    processos = [{"numeroProcesso": f"000{i}"} for i in range(10)]
+    
+    async def run():
+        async with aclosing(use_case.execute_many(
+            processos,
+            [f"req-{i}" for i in range(10)]
+        )) as outcomes:
+            async for _, outcome in outcomes:
+                # Same short-circuit the batch route applies
+                if isinstance(outcome, APICreditsExhaustedError):
+                    break
+        # Give any leaked task the chance to start another call
+        await asyncio.sleep(0.05)
+        await service.aclose()
+    
+    asyncio.run(run())
+    
+    # Only the calls admitted by the semaphore before the stop ever ran
+    assert len(calls) == 2
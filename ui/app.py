@@ -1,9 +1,16 @@
 import streamlit as st
 import requests
-import json
-from datetime import datetime
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util import Retry
+import orjson
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, List, Optional
 import time
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 
 st.set_page_config(
@@ -15,6 +22,12 @@ st.set_page_config(
 
 API_BASE_URL = "http://llm-engine-api:8000"
 
+# Connect fails fast; the read timeout covers the LLM call and is tunable
+CONNECT_TIMEOUT = 3.05
+VERIFY_MAX_ATTEMPTS = 2
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 st.markdown("""
 <style>
     .stTabs [role="tablist"] {
@@ -30,64 +43,161 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Shared HTTP session so reruns reuse keep-alive connections."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=8,
+        # Transient gateway/rate-limit answers are retried with jittered
+        # backoff; POST keeps urllib3's default of never being retried
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            backoff_jitter=0.2,
+            status_forcelist=(429, 502, 503, 504),
+            respect_retry_after_header=True
+        )
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_data(ttl=30)
 def fetch_health():
     """Check API health."""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
+        response = get_session().get(f"{API_BASE_URL}/health", timeout=5)
         return response.status_code == 200
     except:
         return False
 
 
-def verify_process(processo_data: Dict[str, Any]):
-    """Send process for verification."""
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/verify/",
-            json=processo_data,
-            timeout=30
-        )
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"Erro ao conectar com API: {str(e)}")
-        return None
+def is_read_timeout(error: requests.exceptions.RequestException) -> bool:
+    """Whether a request failed because the server stopped sending data."""
+    if isinstance(error, requests.exceptions.ReadTimeout):
+        return True
+    # Stalls while iterating a streamed body surface as ConnectionError
+    # wrapping urllib3's ReadTimeoutError (see Response.iter_content)
+    return (
+        isinstance(error, requests.exceptions.ConnectionError)
+        and bool(error.args)
+        and isinstance(error.args[0], ReadTimeoutError)
+    )
+
+
+def verify_process(
+    processo_data: Dict[str, Any],
+    read_timeout: float = 30.0,
+    on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+):
+    """
+    Send process for verification, streaming the reply as it is generated.
+    
+    The read timeout applies between streamed lines, so only a stalled
+    reply is retried, not a long one that keeps producing output.
+    """
+    for attempt in range(1, VERIFY_MAX_ATTEMPTS + 1):
+        try:
+            with get_session().post(
+                f"{API_BASE_URL}/verify/stream",
+                data=orjson.dumps(processo_data),
+                headers=JSON_HEADERS,
+                timeout=(CONNECT_TIMEOUT, read_timeout),
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    message = orjson.loads(line)
+                    if "partial" in message:
+                        if on_partial is not None:
+                            on_partial(message["partial"])
+                    elif "result" in message:
+                        return message["result"]
+                    else:
+                        st.error(f"Erro na verificação: {message.get('error')}")
+                        return None
+            st.error("Resposta da API interrompida")
+            return None
+        except requests.exceptions.RequestException as e:
+            if not is_read_timeout(e):
+                st.error(f"Erro ao conectar com API: {str(e)}")
+                return None
+            if attempt == VERIFY_MAX_ATTEMPTS:
+                st.error(f"Tempo esgotado ao aguardar a API: {str(e)}")
+                return None
 
 
+@st.cache_data(ttl=30)
 def get_analytics():
     """Get analytics data."""
     try:
-        response = requests.get(
+        response = get_session().get(
             f"{API_BASE_URL}/analytics/summary",
             timeout=5
         )
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     except:
         return None
 
 
-def get_processes():
-    """List verified processes."""
+@st.cache_data(ttl=15)
+def get_processes(decision: Optional[str] = None, limit: int = 100):
+    """List verified processes, filtered and limited by the API."""
+    params = {"limit": limit}
+    if decision:
+        params["decision"] = decision
     try:
-        response = requests.get(
+        response = get_session().get(
             f"{API_BASE_URL}/process/",
+            params=params,
             timeout=5
         )
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     except:
         return []
 
 
-st.markdown("# Verificador de Processos Judiciais")
-st.markdown("---")
+def submission_key(*values: Any) -> str:
+    """Hash of the form values, ignoring the per-submission timestamp."""
+    return hashlib.blake2b(orjson.dumps(values), digest_size=16).hexdigest()
 
-if not fetch_health():
-    st.error("API is not available. Please ensure the server is running at http://localhost:8000")
-    st.stop()
 
-st.success("API connected")
+def fetch_many(calls: List[Callable[[], Any]]) -> List[Any]:
+    """Run independent API calls concurrently and return their results in order."""
+    # Worker threads need the script context to use Streamlit caches
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(
+        max_workers=len(calls),
+        initializer=add_script_run_ctx,
+        initargs=(None, ctx)
+    ) as executor:
+        return list(executor.map(lambda call: call(), calls))
+
+
+def get_page_fetcher(page: str) -> Optional[Callable[[], Any]]:
+    """Return the call loading the data a page needs, run with the health check."""
+    if page == "Histórico":
+        # Filter widgets keep their values in session state across reruns
+        decision = st.session_state.get("historico_decision", "Todas")
+        return partial(
+            get_processes,
+            None if decision == "Todas" else decision,
+            st.session_state.get("historico_limit", 20)
+        )
+    if page == "Analytics":
+        return get_analytics
+    return None
+
+
+st.markdown("# Verificador de Processos Judiciais")
+st.markdown("---")
 
 with st.sidebar:
     st.header("Menu")
@@ -95,6 +205,27 @@ with st.sidebar:
         "Selecione uma página:",
         ["Verificador", "Histórico", "Analytics", "Documentação"]
     )
+    
+    read_timeout = st.number_input(
+        "Timeout de verificação (s)",
+        min_value=5.0,
+        max_value=120.0,
+        value=30.0,
+        step=5.0
+    )
+    
+    # GET results are cached between reruns; this forces a fresh fetch
+    if st.button("Atualizar dados"):
+        st.cache_data.clear()
+
+page_fetcher = get_page_fetcher(page)
+if page_fetcher is not None:
+    healthy, page_data = fetch_many([fetch_health, page_fetcher])
+else:
+    healthy, page_data = fetch_health(), None
+
+# Pages still render when the API is down; only submitting is disabled
+st.sidebar.write("🟢 API online" if healthy else "🔴 API offline")
 
 if page == "Verificador":
     st.header("Verificação de Processo")
@@ -142,30 +273,49 @@ if page == "Verificador":
         st.subheader("Documentos")
         st.write("Adicione documentos do processo (opcional)")
         
-        documentos = []
+        doc_nome = doc_texto = None
         if st.checkbox("Adicionar documento"):
             doc_nome = st.text_input("Nome do documento")
             doc_texto = st.text_area("Texto do documento")
-            if doc_nome and doc_texto:
-                documentos.append({
-                    "id": "DOC-1",
-                    "dataHoraJuntada": datetime.utcnow().isoformat(),
-                    "nome": doc_nome,
-                    "texto": doc_texto
-                })
         
-        submitted = st.form_submit_button("Verificar Processo", type="primary")
+        submitted = st.form_submit_button(
+            "Verificar Processo",
+            type="primary",
+            disabled=not healthy
+        )
         
-        if submitted:
-            if not numero_processo:
-                st.error("Número do processo é obrigatório")
-            else:
+        if submitted and not numero_processo:
+            st.error("Número do processo é obrigatório")
+        elif submitted:
+            # Same form content already verified in this session: reuse
+            # it without another round trip to the API on a re-click
+            form_key = submission_key(
+                numero_processo, classe, orgao_julgador, assunto,
+                siglaTribunal, esfera, valor_condenacao, segredo_justica,
+                justica_gratuita, doc_nome, doc_texto
+            )
+            verified = st.session_state.setdefault("verified_forms", {})
+            resultado = verified.get(form_key)
+            
+            if resultado is None:
                 with st.spinner("Verificando processo..."):
+                    # One timestamp per submission, taken when it is sent
+                    now_iso = datetime.now(timezone.utc).isoformat()
+                    
+                    documentos = []
+                    if doc_nome and doc_texto:
+                        documentos.append({
+                            "id": "DOC-1",
+                            "dataHoraJuntada": now_iso,
+                            "nome": doc_nome,
+                            "texto": doc_texto
+                        })
+                    
                     processo_data = {
                         "numeroProcesso": numero_processo,
                         "classe": classe,
                         "orgaoJulgador": orgao_julgador,
-                        "ultimaDistribuicao": datetime.utcnow().isoformat(),
+                        "ultimaDistribuicao": now_iso,
                         "assunto": assunto,
                         "segredoJustica": segredo_justica,
                         "justicaGratuita": justica_gratuita,
@@ -175,46 +325,62 @@ if page == "Verificador":
                         "documentos": documentos
                     }
                     
-                    resultado = verify_process(processo_data)
+                    # Show the rationale while the LLM is still writing it
+                    preview = st.empty()
+                    resultado = verify_process(
+                        processo_data,
+                        read_timeout,
+                        on_partial=lambda partial: preview.markdown(
+                            partial.get("rationale") or "..."
+                        )
+                    )
+                    preview.empty()
                     
                     if resultado:
-                        st.success("✓ Verificação concluída!")
-                        
-                        decision = resultado.get("decision", "unknown")
-                        
-                        if decision == "approved":
-                            st.success(f"Decisão: APROVADO")
-                            color = "green"
-                        elif decision == "rejected":
-                            st.error(f"Decisão: REJEITADO")
-                            color = "red"
-                        else:
-                            st.warning(f"Decisão: INCOMPLETO")
-                            color = "orange"
+                        verified[form_key] = resultado
                         
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Decisão", decision.upper())
-                        with col2:
-                            st.metric("Confiança", f"{resultado.get('confidence', 0):.1%}")
-                        with col3:
-                            st.metric("Tempo", f"{resultado.get('processingTimeMs', 0)}ms")
-                        
-                        st.subheader("Justificativa")
-                        st.write(resultado.get("rationale", "Sem justificativa"))
-                        
-                        st.subheader("Políticas Citadas")
-                        citations = resultado.get("citations", [])
-                        if citations:
-                            # Display citations as badges using markdown
-                            badges = " ".join([f"`{str(c)}`" for c in citations])
-                            st.markdown(badges)
-                        else:
-                            st.info("Nenhuma política específica citada")
-                        
-                        # Exibir JSON completo
-                        with st.expander("Ver resposta completa (JSON)"):
-                            st.json(resultado)
+                        # New verification: cached history and analytics are stale
+                        get_processes.clear()
+                        get_analytics.clear()
+            
+            if resultado:
+                st.success("✓ Verificação concluída!")
+                
+                decision = resultado.get("decision", "unknown")
+                
+                if decision == "approved":
+                    st.success(f"Decisão: APROVADO")
+                    color = "green"
+                elif decision == "rejected":
+                    st.error(f"Decisão: REJEITADO")
+                    color = "red"
+                else:
+                    st.warning(f"Decisão: INCOMPLETO")
+                    color = "orange"
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Decisão", decision.upper())
+                with col2:
+                    st.metric("Confiança", f"{resultado.get('confidence', 0):.1%}")
+                with col3:
+                    st.metric("Tempo", f"{resultado.get('processingTimeMs', 0)}ms")
+                
+                st.subheader("Justificativa")
+                st.write(resultado.get("rationale", "Sem justificativa"))
+                
+                st.subheader("Políticas Citadas")
+                citations = resultado.get("citations", [])
+                if citations:
+                    # Display citations as badges using markdown
+                    badges = " ".join([f"`{str(c)}`" for c in citations])
+                    st.markdown(badges)
+                else:
+                    st.info("Nenhuma política específica citada")
+                
+                # Exibir JSON completo
+                with st.expander("Ver resposta completa (JSON)"):
+                    st.json(resultado)
 
 
 elif page == "Histórico":
@@ -222,23 +388,20 @@ elif page == "Histórico":
     
     col1, col2 = st.columns(2)
     with col1:
-        decision_filter = st.selectbox(
+        st.selectbox(
             "Filtrar por decisão:",
-            ["Todas", "approved", "rejected", "incomplete"]
+            ["Todas", "approved", "rejected", "incomplete"],
+            key="historico_decision"
         )
     with col2:
-        limit = st.slider("Mostrar últimas N verificações:", 10, 100, 20)
+        st.slider("Mostrar últimas N verificações:", 10, 100, 20, key="historico_limit")
     
-    processes = get_processes()
+    # Already filtered and limited by the API
+    processes = page_data
     
     if not processes:
         st.info("Nenhuma verificação realizada ainda")
     else:
-        if decision_filter != "Todas":
-            processes = [p for p in processes if p.get("decision") == decision_filter]
-        
-        processes = processes[:limit]
-        
         st.write(f"Mostrando {len(processes)} verificação(ões)")
         
         for proc in processes:
@@ -266,7 +429,7 @@ elif page == "Histórico":
 elif page == "Analytics":
     st.header("Dashboard Analytics")
     
-    analytics = get_analytics()
+    analytics = page_data
     
     if analytics:
         col1, col2, col3, col4 = st.columns(4)
@@ -314,6 +477,7 @@ elif page == "Documentação":
     
     ### Verificação
     - `POST /verify/` - Verifica um processo
+    - `POST /verify/stream` - Verifica um processo com resposta em streaming (NDJSON)
     - `POST /verify/batch` - Verifica múltiplos processos
     
     ### Consulta